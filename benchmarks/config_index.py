@@ -0,0 +1,93 @@
+"""Benchmark for (re)building the config index on a large parts folder.
+
+Generates a synthetic tree of ``.part`` files, then times a cold build of the
+index, and a warm refresh, for several read pool sizes. Network drives can be
+approximated with ``--latency-ms``, which adds a delay to every file read.
+
+Usage::
+
+    python benchmarks/config_index.py --files 10000 --threads 1 8 16
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from mavenworks.server import config_object_tracker
+from mavenworks.server.config_index import ConfigObjectIndex
+
+
+def make_tree(root_dir, n_files, files_per_dir=100, body_size=2000):
+    """Write ``n_files`` synthetic config objects under ``root_dir``."""
+    rng = random.Random(42)
+    for i in range(n_files):
+        folder = os.path.join(root_dir, "dir" + str(i // files_per_dir))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "Part%d.part" % i), "w") as f:
+            json.dump({
+                "typeName": "Part",
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "data": {
+                    "htmlText": "x" * rng.randint(body_size // 2, body_size),
+                    "jsText": "",
+                    "cssText": "",
+                },
+                "functionType": "Part",
+                "arguments": [],
+            }, f)
+
+
+def add_latency(latency_ms):
+    """Simulate a slow filesystem by delaying every config object read."""
+    read = config_object_tracker.ConfigObjectTracker.try_read_path
+
+    def slow_read(*args, **kwargs):
+        time.sleep(latency_ms / 1000)
+        return read(*args, **kwargs)
+
+    config_object_tracker.ConfigObjectTracker.try_read_path = \
+        staticmethod(slow_read)
+
+
+def time_call(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp(prefix="mavenworks-bench-")
+    try:
+        make_tree(root_dir, args.files)
+        if args.latency_ms:
+            add_latency(args.latency_ms)
+        baseline = None
+        for threads in args.threads:
+            index = ConfigObjectIndex(root_dir, read_threads=threads)
+            cold, objs = time_call(
+                lambda: index.get_objects_in_tree("/", headers_only=True)
+            )
+            warm, _ = time_call(index.refresh)
+            # ordering must not depend on the number of threads
+            paths = [obj["path"] for obj in objs]
+            assert baseline is None or paths == baseline, "Ordering changed!"
+            baseline = paths
+            print("threads=%-3d objects=%d cold=%.3fs warm refresh=%.3fs" % (
+                threads, len(objs), cold, warm
+            ))
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == "__main__":
+    main()
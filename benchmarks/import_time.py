@@ -0,0 +1,86 @@
+"""Regression benchmark for the time it takes to ``import mavenworks``.
+
+Runs ``python -X importtime`` in a fresh interpreter, with the modules a
+kernel has already loaded (IPython, ipykernel, tornado) imported first, so
+that only the cost MavenWorks adds is measured. Fails if that cost exceeds
+``--max-ms``, or if any of the libraries that MavenWorks loads lazily were
+imported eagerly.
+
+Usage::
+
+    python benchmarks/import_time.py --runs 5 --max-ms 200
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+#: Modules that a kernel has loaded before it imports mavenworks
+PRELOADED = ["IPython", "ipykernel.comm", "tornado.ioloop"]
+#: Slow libraries that must not be imported by ``import mavenworks``
+LAZY_MODULES = ["pandas", "pyarrow", "matplotlib", "ipywidgets", "rx"]
+
+_line_regex = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure():
+    """Import mavenworks in a new interpreter.
+
+    Returns a dict of top-level module name to cumulative import time (us),
+    for the modules imported by mavenworks.
+    """
+    code = "import {}; import sys; sys.stderr.write('--mavenworks--\\n'); " \
+        "import mavenworks".format(", ".join(PRELOADED))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    _, _, output = proc.stderr.partition("--mavenworks--\n")
+    modules = {}
+    for line in output.splitlines():
+        match = _line_regex.match(line)
+        if match is None:
+            continue
+        _, cumulative, _, name = match.groups()
+        modules[name] = int(cumulative)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    timings = []
+    modules = {}
+    for _ in range(args.runs):
+        modules = measure()
+        timings.append(modules["mavenworks"] / 1000)
+    best = min(timings)
+    print("import mavenworks: best=%.1fms median=%.1fms" % (
+        best, sorted(timings)[len(timings) // 2]
+    ))
+    slowest = sorted(modules.items(), key=lambda i: i[1], reverse=True)
+    for name, cumulative in slowest[:10]:
+        print("  %8.1fms  %s" % (cumulative / 1000, name))
+
+    failed = False
+    eager = {
+        name.split(".")[0] for name in modules
+    }.intersection(LAZY_MODULES)
+    if len(eager) > 0:
+        print("FAIL: imported eagerly: " + ", ".join(sorted(eager)))
+        failed = True
+    if best > args.max_ms:
+        print("FAIL: import took longer than %.1fms" % args.max_ms)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
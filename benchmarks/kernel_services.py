@@ -0,0 +1,276 @@
+"""Headless benchmarks for the Python kernel services.
+
+Covers table (de)serialization, ``guess_type``, KernelPartManager
+create/render/dispose cycles, ``evaluate_expr`` against a large namespace,
+and ConfigObjectTracker scans. None of these need a browser or a running
+kernel: comms are replaced with a fake that records what was sent, and
+expressions are evaluated in an in-process IPython shell.
+
+Timings are the best per-call time over several repeats, to reduce noise
+from other work on the machine. Results can be saved as a baseline, and
+later runs compared against it::
+
+    python benchmarks/kernel_services.py --save benchmarks/baseline.json
+    python benchmarks/kernel_services.py --compare benchmarks/baseline.json
+
+Comparisons fail if a benchmark got slower than ``--tolerance`` times its
+baseline. Baselines are only meaningful on the machine that made them, so
+they aren't committed: save one from the base branch on the same machine
+(or CI runner) before comparing.
+"""
+
+import argparse
+import fnmatch
+import json
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from IPython.core.interactiveshell import InteractiveShell
+# the services register comms on import if there's a shell, so they have to
+# be imported before the shell is created
+from mavenworks import serialize, deserialize, guess_type, KernelPart, \
+    register_part
+from mavenworks import serialization
+from mavenworks.services.KernelPartManager import KernelPartManager
+from mavenworks.services.expression_evaluator import evaluate_expr
+from mavenworks.server.config_object_tracker import ConfigObjectTracker
+from config_index import make_tree
+
+_benchmarks = []
+_cleanup = []
+
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function does any setup, and returns a callable to time.
+    """
+    def register(fn):
+        _benchmarks.append((name, fn))
+        return fn
+    return register
+
+
+class FakeComm:
+    """Stands in for an ipykernel Comm, and keeps the last message sent."""
+
+    def __init__(self):
+        self.last_msg = None
+
+    def send(self, data=None, metadata=None, buffers=None):
+        self.last_msg = (data, buffers)
+
+
+def make_table(rows, cols, dtype):
+    """Make a DataFrame of the given shape, with columns of a single dtype."""
+    rng = np.random.RandomState(42)
+    data = {}
+    for i in range(cols):
+        if dtype == "float":
+            data["c%d" % i] = rng.standard_normal(rows)
+        elif dtype == "int":
+            data["c%d" % i] = rng.randint(0, 1000, rows)
+        elif dtype == "str":
+            data["c%d" % i] = rng.randint(0, 1000, rows).astype(str)
+        elif dtype == "datetime":
+            data["c%d" % i] = pd.date_range("2000-01-01", periods=rows)
+    return pd.DataFrame(data)
+
+
+def json_table(df):
+    """Serialize a table without Arrow, as older clients would receive it."""
+    arrow = serialization._pyarrow
+    serialization._pyarrow = (None, False)
+    try:
+        return serialize(df, "Table")
+    finally:
+        serialization._pyarrow = arrow
+
+
+_table_shapes = [
+    (100, 5, "float"),
+    (10000, 5, "float"),
+    (10000, 50, "float"),
+    (10000, 5, "int"),
+    (10000, 5, "str"),
+    (10000, 5, "datetime"),
+]
+
+for _rows, _cols, _dtype in _table_shapes:
+    _shape = "%dx%d_%s" % (_rows, _cols, _dtype)
+
+    @benchmark("serialize.table_" + _shape)
+    def _serialize_table(rows=_rows, cols=_cols, dtype=_dtype):
+        df = make_table(rows, cols, dtype)
+        return lambda: serialize(df, "Table")
+
+    # clients always send tables back as JSON, which is too slow to make
+    # from very large tables
+    _json_rows = min(_rows, 1000)
+
+    @benchmark("deserialize.table_%dx%d_%s" % (_json_rows, _cols, _dtype))
+    def _deserialize_table(rows=_json_rows, cols=_cols, dtype=_dtype):
+        serialized = json_table(make_table(rows, cols, dtype))
+        return lambda: deserialize(serialized)
+
+
+@benchmark("serialize.table_json_1000x5_float")
+def _serialize_json_table():
+    df = make_table(1000, 5, "float")
+    return lambda: json_table(df)
+
+
+@benchmark("guess_type.mixed_1000")
+def _guess_type():
+    values = [1, 2.5, "text", True, None, [1, 2], {"a": 1},
+              pd.Timestamp("2000-01-01"), make_table(5, 2, "float")] * 111
+
+    def run():
+        for value in values:
+            guess_type(value)
+    return run
+
+
+@register_part(name="_BenchmarkPart")
+class _BenchmarkPart(KernelPart):
+    """A part that renders a small HTML table of its input."""
+
+    @classmethod
+    def get_metadata(cls):
+        metadata = super().get_metadata()
+        metadata.add_option("Input Data", None, "Table")
+        metadata.add_option("Rows", 10, "Number")
+        return metadata
+
+    def render(self, opts):
+        return opts["Input Data"].head(int(opts["Rows"]))
+
+
+def _msg(msg_type, uuid, payload, **kwargs):
+    data = {"msg_type": msg_type, "uuid": uuid, "payload": payload}
+    data.update(kwargs)
+    return {"content": {"data": data}}
+
+
+@benchmark("dispatch_msg.create_render_dispose")
+def _dispatch_cycle():
+    # KernelPartManager only allows one instance, and it's normally made
+    # when the services are imported
+    manager = KernelPartManager.Create()
+    comm = FakeComm()
+    options = {
+        "Input Data": json_table(make_table(100, 5, "float")),
+        "Rows": serialize(10, "Number"),
+    }
+
+    def run():
+        manager.dispatch_msg(_msg("create", "bench", "_BenchmarkPart"), comm)
+        manager.dispatch_msg(_msg("initialize", "bench", None), comm)
+        manager.dispatch_msg(
+            _msg("render", "bench", options, accept_buffers=True),
+            comm
+        )
+        manager.dispatch_msg(_msg("dispose", "bench", None), comm)
+    return run
+
+
+@benchmark("evaluate_expr.user_ns_100000")
+def _evaluate_expr():
+    shell = InteractiveShell.instance()
+    for i in range(100000):
+        shell.user_ns["var%d" % i] = i
+    shell.user_ns["df"] = make_table(1000, 5, "float")
+    comm = FakeComm()
+    globals_dict = {"threshold": 0.5}
+    return lambda: evaluate_expr(
+        "df[df.c0 > @threshold]",
+        globals_dict,
+        comm,
+        "bench"
+    )
+
+
+@benchmark("config_tracker.scan_2000")
+def _config_scan():
+    root_dir = tempfile.mkdtemp(prefix="mavenworks-bench-")
+    _cleanup.append(lambda: shutil.rmtree(root_dir))
+    make_tree(root_dir, 2000)
+    return lambda: list(
+        ConfigObjectTracker.get_objects_in_subtree(root_dir, "")
+    )
+
+
+def time_benchmark(fn, repeat, min_time=0.2):
+    """Return the best per-call time of ``fn``, in seconds.
+
+    Each repeat calls ``fn`` enough times to take at least ``min_time``.
+    """
+    fn()  # warm up caches, and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--filter", default="*",
+                        help="Only run benchmarks matching this glob")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="Save the results to this file")
+    parser.add_argument("--compare", help="Compare against this baseline")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    try:
+        for name, setup in _benchmarks:
+            if not fnmatch.fnmatch(name, args.filter):
+                continue
+            result = time_benchmark(setup(), args.repeat)
+            results[name] = result
+            line = "%-45s %10.3fms" % (name, result * 1000)
+            if name in baseline:
+                ratio = result / baseline[name]
+                line += "  %5.2fx" % ratio
+                if ratio > args.tolerance:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line)
+    finally:
+        for cleanup in _cleanup:
+            cleanup()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if len(regressions) > 0:
+        print("FAIL: %d benchmark(s) slower than %.2fx their baseline" % (
+            len(regressions), args.tolerance
+        ))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
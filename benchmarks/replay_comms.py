@@ -0,0 +1,167 @@
+"""Replay a comm recording against fresh kernel services.
+
+Recordings are made by ``mavenworks.start_recording`` or the
+``comm_record_dir`` setting. Every recorded message is sent to a new
+KernelPartManager, expression evaluator, or metadata handler through a
+stand-in comm, either at the recorded pace (``--speed 1`` is real time,
+``--speed 2`` twice as fast) or as fast as possible (``--speed max``).
+
+Reports throughput, and latency percentiles for each kind of message. At the
+recorded pace, latency is measured from when a message was due, so it
+includes time spent waiting behind slower messages. The kernel's recorded
+handling time is shown alongside for comparison.
+
+Messages that reference notebook state (like the globals that expressions
+use) need that state to exist. Pass a script that recreates it with
+``--setup``. Part sources in the recording are run after the setup script.
+
+Usage::
+
+    python benchmarks/replay_comms.py session.jsonl.gz --speed max
+    python benchmarks/replay_comms.py session.jsonl.gz --setup load_data.py
+"""
+
+import argparse
+import gzip
+import json
+import time
+import traceback
+from base64 import b64decode
+from collections import defaultdict
+from IPython.core.interactiveshell import InteractiveShell
+# the services register comms on import if there's a shell, so they have to
+# be imported before the shell is created
+from mavenworks.services.KernelPartManager import KernelPartManager
+from mavenworks.services.expression_evaluator import dispatch_message
+from mavenworks.services.MetadataComm import _on_msg
+from mavenworks.services.comm_recorder import FORMAT_VERSION
+
+
+class ReplayComm:
+    """Stands in for an ipykernel Comm, and counts what was sent."""
+
+    def __init__(self, comm_id):
+        self.comm_id = comm_id
+        self.msgs_sent = 0
+
+    def send(self, data=None, metadata=None, buffers=None):
+        self.msgs_sent += 1
+
+
+def load_recording(path):
+    """Return the header and events of a recording."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version", None) != FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported recording version: %r" % header.get("version")
+            )
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a sorted list."""
+    if len(values) == 0:
+        return float("nan")
+    index = max(0, int(round(pct / 100 * len(values))) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def format_stats(name, latencies, recorded):
+    latencies = sorted(latencies)
+    recorded = sorted(i for i in recorded if i == i)  # drop NaNs
+    return "%-40s %6d %9.2f %9.2f %9.2f %9.2f %12.2f" % (
+        name,
+        len(latencies),
+        percentile(latencies, 50) * 1000,
+        percentile(latencies, 90) * 1000,
+        percentile(latencies, 99) * 1000,
+        latencies[-1] * 1000,
+        percentile(recorded, 50) * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("recording")
+    parser.add_argument("--speed", default="max",
+                        help="'max', or a multiple of the recorded pace")
+    parser.add_argument("--setup",
+                        help="A Python script to run before replaying")
+    args = parser.parse_args()
+    speed = None if args.speed == "max" else float(args.speed)
+
+    _, events = load_recording(args.recording)
+    shell = InteractiveShell.instance()
+    shell.run_cell("from mavenworks import *")
+    if args.setup:
+        with open(args.setup) as f:
+            shell.run_cell(f.read())
+    for event in events:
+        if event["event"] == "part_source" and event["source"] is not None:
+            shell.run_cell(event["source"])
+
+    manager = KernelPartManager()
+    handlers = {
+        "kernel_proxy_part": lambda comm, msg: manager.dispatch_msg(msg, comm),
+        "expression_evaluator": dispatch_message,
+        "maven_metadata": _on_msg,
+    }
+    comms = {}
+    latencies = defaultdict(list)
+    recorded = defaultdict(list)
+    errors = defaultdict(int)
+
+    start = time.perf_counter()
+    for event in events:
+        if event["event"] != "msg":
+            continue
+        due = start
+        if speed is not None:
+            due = start + event["t"] / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        comm = comms.get(event["comm_id"], None)
+        if comm is None:
+            comm = comms[event["comm_id"]] = ReplayComm(event["comm_id"])
+        msg = {
+            "content": {"comm_id": event["comm_id"], "data": event["data"]},
+            "buffers": [b64decode(buf) for buf in event.get("buffers", [])]
+        }
+        data = event["data"] or {}
+        kind = event["target"] + ":" + str(data.get("msg_type", None))
+        handled = time.perf_counter()
+        try:
+            handlers[event["target"]](comm, msg)
+        except Exception:
+            errors[kind] += 1
+            if errors[kind] == 1:
+                print("Error replaying %s:" % kind)
+                traceback.print_exc()
+        end = time.perf_counter()
+        latencies[kind].append(end - (due if speed is not None else handled))
+        recorded[kind].append(event.get("duration", float("nan")))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(i) for i in latencies.values())
+    print("Replayed %d messages in %.2fs (%.1f msgs/s), %d errors" % (
+        total, elapsed, total / elapsed if elapsed else 0,
+        sum(errors.values())
+    ))
+    print("%-40s %6s %9s %9s %9s %9s %12s" % (
+        "message (latency in ms)", "count", "p50", "p90", "p99", "max",
+        "recorded p50"
+    ))
+    for kind in sorted(latencies):
+        print(format_stats(kind, latencies[kind], recorded[kind]))
+    print(format_stats(
+        "all",
+        [i for values in latencies.values() for i in values],
+        [i for values in recorded.values() for i in values]
+    ))
+
+
+if __name__ == "__main__":
+    main()
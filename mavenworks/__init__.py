@@ -2,30 +2,56 @@
 
 __version__ = "0.1.0"
 
-from .parts import gen_wrapper, KernelPart, name_display_handle,\
-    register_part, wrap, Option, OptionsBag
+from .parts import KernelPart, name_display_handle, register_part, Option, \
+    OptionsBag, ThrottledDisplayHandle
 from .serialization import guess_type, serialize, deserialize
-from .dashboard import Bind, Dashboard, StackPanel, TabPanel, GridPanel, \
-    CanvasPanel, Part
 from .services import *  # noqa F401 F403
+from .services import start_recording, stop_recording, profile_part, \
+    dump_trace, clear_trace, part_stats
+
+# These pull in pandas, matplotlib, or ipywidgets, so they're imported on
+# first use instead of slowing down every kernel that imports mavenworks.
+_lazy_attrs = {
+    "gen_wrapper": "parts",
+    "wrap": "parts",
+    "Bind": "dashboard",
+    "Dashboard": "dashboard",
+    "StackPanel": "dashboard",
+    "TabPanel": "dashboard",
+    "GridPanel": "dashboard",
+    "CanvasPanel": "dashboard",
+    "Part": "dashboard",
+}
 
 __all__ = [
     "name_display_handle",
+    "ThrottledDisplayHandle",
     "register_part",
     "KernelPart",
-    "gen_wrapper",
-    "wrap",
     "guess_type",
     "serialize",
     "deserialize",
     "Option",
     "OptionsBag",
-    "gen_wrapper",
-    "Bind",
-    "Dashboard",
-    "StackPanel",
-    "TabPanel",
-    "GridPanel",
-    "CanvasPanel",
-    "Part",
+    "start_recording",
+    "stop_recording",
+    "profile_part",
+    "dump_trace",
+    "clear_trace",
+    "part_stats",
 ]
+__all__ += _lazy_attrs.keys()
+
+
+def __getattr__(name):
+    if name not in _lazy_attrs:
+        raise AttributeError("module " + repr(__name__) +
+                             " has no attribute " + repr(name))
+    from importlib import import_module
+    value = getattr(import_module("." + _lazy_attrs[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
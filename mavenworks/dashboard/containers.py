@@ -1,20 +1,55 @@
+from types import MappingProxyType
 from .part import Part
-from .helpers import kwargs_to_properties
+from .helpers import kwargs_to_properties, stable_id
 
 
 class Container:
-    def __init__(self, container_type, *children, **properties):
+    def __init__(self, container_type, *children, key=None, **properties):
+        """Create a container.
+
+        :param container_type: The layout region type number
+        :param children: The parts and containers to add
+        :param key: An id for this container, unique among its siblings.
+            See :class:`Part`.
+        """
+        self._key = key
         self.__type = container_type
-        self.__children = children or []
+        self.__children = []
         self.__properties = properties or {}
         self._name = "Container"
+        # (path, result of _serialize), cleared when this subtree changes
+        self.__cache = None
+        self._parents = []
+        self.add(*children)
 
     def add(self, *children):
+        for child in children:
+            child._parents.append(self)
         self.__children += children
+        self._invalidate()
+
+    def _invalidate(self):
+        if self.__cache is None:
+            return  # already dirty, and so are our parents
+        self.__cache = None
+        for parent in self._parents:
+            parent._invalidate()
 
     @property
     def properties(self):
-        return self.__properties
+        """The layout properties of this container. Read-only.
+
+        Use :meth:`set_property` to change them, so that the cached layout is
+        rebuilt.
+        """
+        return MappingProxyType(self.__properties)
+
+    def set_property(self, name, value):
+        """Set a layout property, using the same names as the constructor."""
+        self.__properties[name] = value
+        self.__cache = None
+        for parent in self._parents:
+            parent._invalidate()
 
     def __repr__(self):
         repr_str = self._name + ":"
@@ -37,21 +72,58 @@ class Container:
                 parts += child._collect_parts()
         return parts
 
-    def _as_json(self):
+    def _as_json(self, path="root"):
+        representation, attached_props, _ = self._serialize(path)
+        return representation, attached_props
+
+    def _id_kind(self):
+        return "container:%d" % self.__type
+
+    def _serialize(self, path="root"):
+        """Return the layout, attached props, and part models of this tree.
+
+        Both are built in one traversal, and cached until a part or container
+        in this subtree changes.
+        """
+        if self.__cache is not None and self.__cache[0] == path:
+            return self.__cache[1]
         child_attached_props = []
         children = []
+        parts = {}
         attached_props, layout_props = kwargs_to_properties(self.__properties)
+        # kind -> number of unkeyed children of that kind so far
+        seen_kinds = {}
+        seen_keys = set()
         for child in self.__children:
-            representation, child_props = child._as_json()
+            if child._key is not None:
+                # explicit keys take precedence over the derived path
+                if child._key in seen_keys:
+                    raise ValueError(
+                        "Duplicate key among siblings: %r" % (child._key,)
+                    )
+                seen_keys.add(child._key)
+                child_path = "%s/key:%s" % (path, child._key)
+            else:
+                kind = child._id_kind()
+                index = seen_kinds.get(kind, 0)
+                seen_kinds[kind] = index + 1
+                child_path = "%s/%s#%d" % (path, kind, index)
+            representation, child_props, child_parts = child._serialize(
+                child_path
+            )
             children.append(representation)
             child_attached_props.append(child_props)
+            parts.update(child_parts)
 
-        return {
+        result = ({
+            "uuid": stable_id(path),
             "properties": layout_props,
             "attachedProperties": child_attached_props,
             "typeName": self.__type,
             "children": children
-        }, attached_props
+        }, attached_props, parts)
+        self.__cache = (path, result)
+        return result
 
 
 class StackPanel(Container):
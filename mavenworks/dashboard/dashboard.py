@@ -1,9 +1,61 @@
 """Class for implementing a Jupyter Cell Dashboard using Python."""
 
+import hashlib
+import json
+from IPython.display import display, update_display
+from uuid import uuid4
 from .containers import StackPanel
+from .part import Part
 from ..serialization import serialize
 
 
+def _revision(model):
+    """Return a hash identifying a dashboard model."""
+    return hashlib.sha1(
+        json.dumps(model, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _diff_models(old, new):
+    """Compute the structural diff between two dashboard models.
+
+    Parts are matched by id. A part whose name changed, or that lost an
+    option, is treated as removed and re-added (so that the option reverts to
+    its default). A part whose options changed only lists the options that
+    differ.
+    """
+    old_parts = old["parts"]
+    new_parts = new["parts"]
+    added = {}
+    changed = {}
+    removed = [part_id for part_id in old_parts if part_id not in new_parts]
+    for part_id, part in new_parts.items():
+        old_part = old_parts.get(part_id, None)
+        model = part.get(Part.MIMETYPE, None)
+        old_model = old_part.get(Part.MIMETYPE, None) if old_part else None
+        if (old_model is None or model is None
+                or old_model["name"] != model["name"]
+                or not set(old_model["options"]) <= set(model["options"])):
+            if old_part is not None:
+                removed.append(part_id)
+            added[part_id] = part
+            continue
+        old_options = old_model["options"]
+        options = {
+            name: value for name, value in model["options"].items()
+            if old_options.get(name, None) != value
+        }
+        if len(options) > 0:
+            changed[part_id] = {"options": options}
+    return {
+        "addedParts": added,
+        "removedParts": removed,
+        "changedParts": changed,
+        "layout": old["layout"] != new["layout"],
+        "globals": old["globals"] != new["globals"]
+    }
+
+
 class Dashboard:
     """The root of a Cell Dashboard."""
 
@@ -13,6 +65,9 @@ class Dashboard:
         """Create a new, empty Dashboard."""
         self.__globals = []
         self.__root = StackPanel()
+        self.__display_id = None
+        self.__last_model = None
+        self.__last_revision = None
 
     @property
     def root(self):
@@ -27,6 +82,36 @@ class Dashboard:
             "value": serialize(default, type_annotation)
         })
 
+    def update(self):
+        """Update the last display of this dashboard in place.
+
+        Instead of rebuilding the whole dashboard, the client applies a diff
+        of what changed since the dashboard was last displayed or updated.
+        Parts that were not added, removed, or changed keep running.
+
+        .. note::
+            The full model is still sent alongside the diff, since the
+            notebook stores the latest output of a display.
+
+        :raises RuntimeError: If the dashboard hasn't been displayed yet
+        """
+        if self.__display_id is None:
+            raise RuntimeError(
+                "Dashboard must be displayed before it can be updated"
+            )
+        old_model = self.__last_model
+        old_revision = self.__last_revision
+        data, metadata = self._repr_mimebundle_()
+        patch = _diff_models(old_model, data[self.MIMETYPE])
+        patch["base"] = old_revision
+        metadata[self.MIMETYPE]["patch"] = patch
+        update_display(
+            data,
+            metadata=metadata,
+            raw=True,
+            display_id=self.__display_id
+        )
+
     def __repr__(self):
         """Return a formatted text string with this dashboard's structure."""
         repr_str = "Dashboard " + super().__repr__() + "\n\nGlobals:"
@@ -35,22 +120,38 @@ class Dashboard:
         repr_str += "\nRoot " + repr(self.root)
         return repr_str
 
-    def _repr_mimebundle_(self, include=None, exclude=None):
-        root, _ = self.root._as_json()
-        parts = self.root._collect_parts()
-        parts_repr = {}
-        for part in parts:
-            part_model, part_id = part._as_part()
-            parts_repr[part_id] = part_model
+    def _ipython_display_(self):
+        # display with an id, so that ``update`` can target this output
+        data, metadata = self._repr_mimebundle_()
+        self.__display_id = str(uuid4())
+        display(
+            data,
+            metadata=metadata,
+            raw=True,
+            display_id=self.__display_id
+        )
 
+    def _repr_mimebundle_(self, include=None, exclude=None):
+        root, _, parts = self.root._serialize()
+        model = {
+            "layout": root,
+            "parts": parts,
+            "metadata": {},
+            "globals": list(self.__globals),
+            "visual": False
+        }
+        old_model = self.__last_model
+        # the tree returns the same objects while it's unchanged, so this
+        # skips hashing the whole model on every display
+        if (old_model is None or old_model["layout"] is not root
+                or old_model["parts"] is not parts
+                or old_model["globals"] != model["globals"]):
+            self.__last_revision = _revision(model)
+        self.__last_model = model
         return {
             "text/plain": "Dashboard Layout (if you see this, check your " +
             " plugin install!)",
-            self.MIMETYPE: {
-                "layout": root,
-                "parts": parts_repr,
-                "metadata": {},
-                "globals": self.__globals,
-                "visual": False
-            }
-        }, {}
+            self.MIMETYPE: model
+        }, {
+            self.MIMETYPE: {"revision": self.__last_revision}
+        }
@@ -1,5 +1,11 @@
 """Private utilities for translating kwargs to proper layout props."""
 
+import uuid
+
+# Namespace for the ids of Python-defined dashboard nodes. Don't change this,
+# or every dashboard will be rebuilt on the next update.
+__id_namespace__ = uuid.UUID("5b0c4a2e-6f0d-4d3e-9c1a-6e2f0a7d8b31")
+
 __attached_properties__ = [
     "Fixed Size (px)",
     "Stretch",
@@ -67,3 +73,20 @@ def kwargs_to_properties(kwargs):
             _layout_props[real_key] = value
 
     return _attached_props, _layout_props
+
+
+def stable_id(path):
+    """Return a deterministic UUID for a node at the given path in a layout.
+
+    Re-running the code that builds a dashboard then produces the same ids,
+    so the client can tell which parts and regions are unchanged.
+
+    Paths are made of what each node is, rather than where it is: a part's
+    name or a container's type, plus how many siblings of the same kind come
+    before it (see ``Container._serialize``). So inserting or reordering nodes
+    only re-keys siblings of the same kind. Part options are deliberately left
+    out, so that changing an option patches the part in place instead of
+    replacing it. Nodes given an explicit ``key`` use that instead, so
+    repeated part types can keep their ids too.
+    """
+    return str(uuid.uuid5(__id_namespace__, path))
@@ -1,46 +1,182 @@
 """Provides the Part wrapper for the Textual Declarative API."""
 
-import uuid
+import hashlib
+from collections import OrderedDict
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
+from uuid import uuid4
 from ..serialization import serialize, guess_type
-from .bind import Binding
-from .helpers import kwargs_to_properties
+from ..settings import get_setting
+from .bind import Binding, Py
+from .helpers import kwargs_to_properties, stable_id
+
+# key -> option value too large to inline in a layout, least recently used
+# first. These are held strongly, since a displayed dashboard can outlive the
+# Parts that created it.
+_hoisted_values = OrderedDict()
+
+
+def _get_hoisted_value(key):
+    """Return a hoisted option value. Clients call this through a binding."""
+    try:
+        _hoisted_values.move_to_end(key)
+        return _hoisted_values[key]
+    except KeyError:
+        raise KeyError(
+            "This dashboard's data is no longer in the kernel. Re-run the "
+            "cell that created the dashboard."
+        ) from None
+
+
+def _hoist_key(df):
+    """Return a content-derived key for a DataFrame.
+
+    Identical tables get the same key, so that re-running a dashboard doesn't
+    change its layout.
+    """
+    try:
+        hashes = hash_pandas_object(df).values
+    except TypeError:
+        # unhashable cells, like lists
+        return str(uuid4())
+    digest = hashlib.sha1(hashes.tobytes())
+    digest.update(repr(
+        (list(df.columns), [str(dtype) for dtype in df.dtypes])
+    ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def hoist_opt(opt):
+    """Move a large option value into the kernel, and return a binding to it.
+
+    The layout then holds a small binding instead of the serialized table,
+    and the client fetches the table when the part is evaluated, through the
+    expression evaluator (and its Arrow serialization).
+
+    Returns None if the value is small enough to inline.
+    """
+    if not isinstance(opt, DataFrame):
+        return None
+    max_bytes = get_setting("dashboard_inline_max_bytes")
+    # deep sizing walks every string, so only do it when the cheap estimate
+    # (one pointer per object cell) isn't already over the limit
+    if opt.memory_usage(index=True).sum() <= max_bytes and \
+            opt.memory_usage(index=True, deep=True).sum() <= max_bytes:
+        return None
+    key = _hoist_key(opt)
+    _hoisted_values[key] = opt
+    _hoisted_values.move_to_end(key)
+    while len(_hoisted_values) > get_setting("dashboard_hoisted_cache_size"):
+        _hoisted_values.popitem(last=False)
+    return Py(
+        '__import__("mavenworks.dashboard.part", fromlist=["_"])'
+        '._get_hoisted_value("%s")' % key
+    )._as_json()
+
+
+def release_hoisted_values():
+    """Discard every hoisted option value.
+
+    Dashboards displayed before this is called can no longer fetch their
+    tables, and need to be re-run.
+    """
+    _hoisted_values.clear()
 
 
 def serialize_opt(opt):
     """Private helper for serializing a part binding."""
     if isinstance(opt, Binding):
         return opt._as_json()
+    hoisted = hoist_opt(opt)
+    if hoisted is not None:
+        return hoisted
     return serialize(opt, guess_type(opt))
 
 
 class Part:
     MIMETYPE = "application/vnd.maven.part+json"
 
-    def __init__(self, name, options, **props):
+    def __init__(self, name, options, key=None, **props):
+        """Create a part.
+
+        :param name: The part's type, like "SlickGrid"
+        :param options: A dict of option names to values or bindings
+        :param key: An id for this part, unique among its siblings. Parts
+            with a key keep their id when siblings are added, removed, or
+            reordered, so they can be patched in place on update.
+        """
+        self._key = key
         self.__name = name
-        self.__options = options
+        self.__options = dict(options)
         self.__props = props
-        self.__uuid = str(uuid.uuid4())
-        self.__layout_uuid = str(uuid.uuid4())
+        # assigned when laid out, since ids depend on the part's siblings
+        self.__uuid = None
+        self.__layout_uuid = None
+        # option name -> serialized value
+        self.__serialized_options = {}
+        # (path, result of _serialize), cleared when this part changes
+        self.__cache = None
+        self._parents = []
+
+    def set_option(self, name, value):
+        """Set an option on this part.
+
+        Use this instead of mutating the options passed to the constructor,
+        since serialized options are cached until they're set. This includes
+        mutating a value in place (like appending to a list, or changing a
+        DataFrame): set the option again afterwards, or the dashboard will
+        still show the old value.
+        """
+        self.__options[name] = value
+        self.__serialized_options.pop(name, None)
+        self._invalidate()
+
+    def set_property(self, name, value):
+        """Set a layout property, using the same names as the constructor."""
+        self.__props[name] = value
+        self._invalidate()
+
+    def _invalidate(self):
+        self.__cache = None
+        for parent in self._parents:
+            parent._invalidate()
 
     def _as_part(self):
+        for opt, value in self.__options.items():
+            if opt not in self.__serialized_options:
+                self.__serialized_options[opt] = serialize_opt(value)
         return {
             "text/plain": self.__name + " Part Model",
             Part.MIMETYPE: {
                 "name": self.__name,
                 "id": self.__uuid,
-                "options": {
-                    opt: serialize_opt(value)
-                    for opt, value in self.__options.items()
-                }
+                "options": dict(self.__serialized_options)
             }
         }, self.__uuid
 
-    def _as_json(self):
+    def _as_json(self, path="root"):
+        representation, attached_props, _ = self._serialize(path)
+        return representation, attached_props
+
+    def _id_kind(self):
+        return "part:" + self.__name
+
+    def _serialize(self, path="root"):
+        """Return the layout region, attached props, and models of this part.
+
+        The result is cached until an option is set, or the part moves.
+        """
+        if self.__cache is not None and self.__cache[0] == path:
+            return self.__cache[1]
+        self.__uuid = stable_id(path + ":part")
+        self.__layout_uuid = stable_id(path)
         attached_props, layout_props = kwargs_to_properties(self.__props)
-        return {
+        part_model, part_id = self._as_part()
+        result = ({
             "guid": self.__uuid,
-            "id": self.__layout_uuid,
+            "uuid": self.__layout_uuid,
             "typeName": 1,
             "properties": layout_props
-        }, attached_props
+        }, attached_props, {part_id: part_model})
+        self.__cache = (path, result)
+        return result
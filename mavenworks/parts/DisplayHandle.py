@@ -1,10 +1,23 @@
 """Module providing a mechanism to use DisplayHandles in Dashboards."""
 
+import json
+import time
+from collections import OrderedDict
 from IPython.display import DisplayHandle
-from typing import Union, Callable, Dict
+from tornado.ioloop import IOLoop
+from typing import Union, Callable, Dict, Optional, Tuple
+from ..settings import get_setting
 
 _new_name_hook: Union[None, Callable] = None
 _known_names = {}
+# display_id -> (data, metadata, size) of named handles, in LRU order
+_output_cache: "OrderedDict[str, Tuple[dict, dict, int]]" = OrderedDict()
+_output_cache_size = 0
+# display_id -> (data, metadata) of handles that haven't been named (yet),
+# oldest first
+_unnamed_outputs: "OrderedDict[str, Tuple[dict, dict]]" = OrderedDict()
+#: Number of unnamed display outputs kept, in case they're named later
+MAX_UNNAMED_OUTPUTS = 8
 
 
 def _set_name_hook(cb: Callable):
@@ -16,7 +29,175 @@ def _get_known_names() -> Dict[str, str]:
     return _known_names
 
 
-def name_display_handle(name: str, handle: DisplayHandle):
+def _payload_size(data: dict) -> int:
+    """Return the size of a mime bundle's data, in bytes."""
+    size = 0
+    for value in data.values():
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        else:
+            size += len(json.dumps(value, default=str))
+    return size
+
+
+def _cache_output(display_id: str, data: dict, metadata: dict):
+    """Cache the output of a named handle, evicting the least recently used."""
+    global _output_cache_size
+    # measured once here, since named handles are the only ones cached
+    size = _payload_size(data)
+    if display_id in _output_cache:
+        _output_cache_size -= _output_cache.pop(display_id)[2]
+    _output_cache[display_id] = (data, metadata, size)
+    _output_cache_size += size
+    max_size = get_setting("display_handle_cache_bytes")
+    while _output_cache_size > max_size and len(_output_cache) > 0:
+        _, (_, _, evicted_size) = _output_cache.popitem(last=False)
+        _output_cache_size -= evicted_size
+
+
+def _record_display_msg(msg):
+    """Display publisher hook that caches outputs sent to display handles.
+
+    The latest output for each named display handle is kept, so that clients
+    that reconnect can fetch what a named handle is showing without anyone
+    having to re-run code. The cache is bounded by the
+    ``display_handle_cache_bytes`` setting, evicting the least recently used
+    outputs first.
+
+    A handle is usually displayed before it's named, so the outputs of the
+    last few unnamed handles are kept too (without measuring them), and moved
+    to the cache if they're named.
+
+    .. note::
+        ipykernel keeps display hooks per thread, and this is registered on
+        the kernel's main thread. Outputs displayed or updated from other
+        threads aren't cached.
+    """
+    msg_type = msg["header"]["msg_type"]
+    if msg_type not in ("display_data", "update_display_data"):
+        return msg
+    content = msg["content"]
+    display_id = content.get("transient", {}).get("display_id", None)
+    if display_id is None:
+        return msg
+    data = content.get("data", {})
+    metadata = content.get("metadata", {})
+    if display_id in _known_names.values():
+        _cache_output(display_id, data, metadata)
+        return msg
+    _unnamed_outputs.pop(display_id, None)
+    _unnamed_outputs[display_id] = (data, metadata)
+    while len(_unnamed_outputs) > MAX_UNNAMED_OUTPUTS:
+        _unnamed_outputs.popitem(last=False)
+    return msg
+
+
+def _get_cached_output(display_id: str) -> Optional[Tuple[dict, dict]]:
+    """Return the latest (data, metadata) shown by a display, if cached."""
+    if display_id not in _output_cache:
+        return None
+    _output_cache.move_to_end(display_id)
+    data, metadata, _ = _output_cache[display_id]
+    return data, metadata
+
+
+class ThrottledDisplayHandle:
+    """A DisplayHandle wrapper that limits how often updates are published.
+
+    Every call to ``DisplayHandle.update`` formats and publishes a full mime
+    bundle, which quickly backs up both the kernel and the browser when a
+    handle is updated many times a second. This wrapper publishes at most
+    ``max_fps`` updates per second. Updates in between are dropped, except for
+    the latest, which is published once the interval has elapsed. Only
+    published updates are formatted.
+
+    The trailing update is published from the kernel's event loop, so if the
+    kernel is busy (such as when updating from a loop in a cell), it will be
+    published when the cell finishes or on the next ``update``, whichever
+    comes first. Call :meth:`flush` to publish it immediately.
+
+    :Example:
+
+    >>> handle = display(fig, display_id=True)
+    >>> handle = name_display_handle("Live Chart", handle, max_fps=10)
+    >>> for fig in make_figures():
+    ...     handle.update(fig)
+    """
+
+    def __init__(self, handle: DisplayHandle, max_fps: float):
+        """Wrap a DisplayHandle.
+
+        :param handle: The handle to publish updates to
+        :param max_fps: The maximum number of updates to publish per second
+        """
+        self.handle = handle
+        self.min_interval = 1 / max_fps
+        self.published = 0
+        self.dropped = 0
+        self._last_publish = None
+        self._pending = None
+        self._has_pending = False
+        self._flush_scheduled = False
+
+    @property
+    def display_id(self):
+        """The display id of the wrapped handle."""
+        return self.handle.display_id
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of published and dropped updates, for diagnostics."""
+        return {
+            "published": self.published,
+            "dropped": self.dropped,
+            "pending": int(self._has_pending),
+        }
+
+    def display(self, obj, **kwargs):
+        """Make a new display with this handle's display id."""
+        self.handle.display(obj, **kwargs)
+
+    def update(self, obj, **kwargs):
+        """Update the display, dropping the update if it's too soon."""
+        if self._has_pending:
+            self.dropped += 1
+        self._pending = (obj, kwargs)
+        self._has_pending = True
+        now = time.monotonic()
+        if (self._last_publish is None
+                or now - self._last_publish >= self.min_interval):
+            self.flush()
+            return
+        self._schedule_flush(self._last_publish + self.min_interval - now)
+
+    def flush(self):
+        """Publish the latest pending update, if there is one."""
+        if not self._has_pending:
+            return
+        obj, kwargs = self._pending
+        self._pending = None
+        self._has_pending = False
+        self._last_publish = time.monotonic()
+        self.published += 1
+        self.handle.update(obj, **kwargs)
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_scheduled:
+            return
+        loop = IOLoop.current(instance=False)
+        if loop is None:
+            # no event loop, so the next update or flush() will publish it
+            return
+        self._flush_scheduled = True
+        loop.call_later(delay, self._on_scheduled_flush)
+
+    def _on_scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+
+def name_display_handle(name: str, handle: DisplayHandle,
+                        max_fps: Optional[float] = None):
     """Mark a DisplayHandle, so that it can be used in a Dashboard.
 
     Display Handles are simple things you can use to put a cell output into a
@@ -34,8 +215,22 @@ def name_display_handle(name: str, handle: DisplayHandle):
         handle cannot be used in visual dashboards.
     handle : DisplayHandle
         The handle to name. Once named, the handle can be used in dashboards.
+    max_fps : float, optional
+        If given, limit updates to this many per second. See
+        :class:`ThrottledDisplayHandle`.
+
+    Returns
+    -------
+    The handle, wrapped in a :class:`ThrottledDisplayHandle` if ``max_fps``
+    was given.
 
     """
     _known_names[name] = handle.display_id
+    output = _unnamed_outputs.pop(handle.display_id, None)
+    if output is not None:
+        _cache_output(handle.display_id, *output)
     if _new_name_hook is not None:
         _new_name_hook(name, handle.display_id)  # pylint: disable=not-callable
+    if max_fps is not None:
+        return ThrottledDisplayHandle(handle, max_fps)
+    return handle
@@ -14,6 +14,8 @@ def _set_new_part_hook(callback: Union[Callable, None]):
 
 
 def _get_all_parts() -> ItemsView:
+    from . import _load_builtin_parts
+    _load_builtin_parts()
     return registry.items()
 
 
@@ -70,6 +72,9 @@ class KernelPart():
     @staticmethod
     def Create(name):
         """Do not use. Internal method for the KernelPartManager."""
+        if name not in registry:
+            from . import _load_builtin_parts
+            _load_builtin_parts()
         part = registry[name]()
         return part
 
@@ -7,7 +7,6 @@ used by user code, with the exception of :class:PartMetadata.
 from collections import OrderedDict
 from itertools import islice
 from typing import NamedTuple, List
-from rx.subjects import Subject
 
 
 class Option(NamedTuple):
@@ -33,6 +32,9 @@ class PartMetadata:
         """
         # TODO: Format for option metadata
         self.options_bag: List[Option] = []
+        # How long the client should wait for options to settle before
+        # rendering, in milliseconds. 0 renders on every change.
+        self.debounce_ms = 0
 
     def add_option(self, name, default_value=None, type_annotation="Any"):
         self.options_bag.append(Option(name, default_value, type_annotation))
@@ -48,6 +50,8 @@ class OptionsBag:
     def __init__(self, metadata: PartMetadata, model=None):
         self.options_bag = OrderedDict()
         self.is_stale = True
+        # rx is slow to import, and only needed once parts are created
+        from rx.subjects import Subject
         self.OnStale = Subject()
         for opt in metadata.options_bag:
             if model is not None and opt.name in model['options']:
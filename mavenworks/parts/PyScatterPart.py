@@ -1,9 +1,43 @@
 """A short and sweet part to demonstrate the Python Part API."""
-from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from .KernelPart import KernelPart, register_part
+import numpy as np
 import pandas as pd
 
 
+def _lttb(x, y, n_out):
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    LTTB keeps the points that contribute most to the visual shape of the
+    series, which preserves peaks and outliers far better than striding.
+    ``x`` must be sorted.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    # the first and last points are always kept, and everything in between is
+    # split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # the next bucket's average is the third corner of the triangle
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        keep[i + 1] = prev
+    return x[keep], y[keep]
+
+
 @register_part()
 class PyScatterPart(KernelPart):
     """A simple KernelPart.
@@ -13,6 +47,12 @@ class PyScatterPart(KernelPart):
         - Input Data {Table} The data to plot in a scatterplot
         - X Column {String} The column of the above table to use as x-coord
         - Y Column {String} Same, but for the y-coord
+        - Max Points {Number} Tables with more rows than this are aggregated
+          before plotting, instead of scattering every point
+        - Aggregation {String} How to aggregate large tables. "Density" bins
+          the points into a 2D histogram and plots that as an image.
+          "Downsample" picks representative points using LTTB.
+        - Bins {Number} The number of bins on each axis, for "Density"
     """
 
     @classmethod
@@ -23,16 +63,95 @@ class PyScatterPart(KernelPart):
         metadata.add_option("Input Data", df, "Table")
         metadata.add_option("X Column", "x", "String")
         metadata.add_option("Y Column", "y", "String")
+        metadata.add_option("Max Points", 10000, "Number")
+        metadata.add_option("Aggregation", "Density", "String")
+        metadata.add_option("Bins", 256, "Number")
         return metadata
 
+    def __init__(self):
+        """Create a new PyScatterPart. The figure is made in ``initialize``."""
+        super().__init__()
+        self.fig = None
+        self.ax = None
+        self.scatter = None
+        self.image = None
+
+    def initialize(self):
+        """Create the figure and artists that renders will update.
+
+        This uses the object-oriented Agg API instead of pyplot, so that
+        renders don't go through pyplot's global state, and so that the same
+        Figure can be reused between renders.
+        """
+        self.fig = Figure()
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.scatter = self.ax.scatter([], [])
+        self.image = self.ax.imshow(
+            np.zeros((1, 1)),
+            origin="lower",
+            aspect="auto",
+            interpolation="nearest",
+            cmap="viridis",
+            visible=False
+        )
+
     def render(self, opts):
         """Render this part.
 
+        Renders update the artists created in ``initialize``, rather than
+        building a new figure each time.
+
         :param opts: An OptionsBag containing the data we need to render
         """
+        if self.fig is None:
+            self.initialize()
         data = opts["Input Data"]
-        fig = plt.figure()
-        plt.scatter(data[opts["X Column"]], data[opts["Y Column"]])
-        plt.close()
+        x = data[opts["X Column"]].to_numpy(dtype=float)
+        y = data[opts["Y Column"]].to_numpy(dtype=float)
+        if len(x) > opts["Max Points"] and opts["Aggregation"] != "Downsample":
+            self._render_density(x, y, int(opts["Bins"]))
+            return self.fig
+        if len(x) > opts["Max Points"]:
+            order = np.argsort(x, kind="stable")
+            x, y = _lttb(x[order], y[order], int(opts["Max Points"]))
+        self._render_scatter(x, y)
         # technically we can also display() it, or just output it using pyplot
-        return fig
+        return self.fig
+
+    def dispose(self):
+        """Release the figure."""
+        self.fig = self.ax = self.scatter = self.image = None
+        super().dispose()
+
+    def _render_scatter(self, x, y):
+        offsets = np.column_stack((x, y))
+        self.image.set_visible(False)
+        self.scatter.set_visible(True)
+        self.scatter.set_offsets(offsets)
+        # re-fit the axes to the new points
+        self.ax.ignore_existing_data_limits = True
+        finite = offsets[np.isfinite(offsets).all(axis=1)]
+        if len(finite) > 0:
+            self.ax.update_datalim(finite)
+        self.ax.set_autoscale_on(True)
+        self.ax.autoscale_view()
+
+    def _render_density(self, x, y, bins):
+        """Plot a 2D histogram of the points, instead of the points."""
+        finite = np.isfinite(x) & np.isfinite(y)
+        counts, x_edges, y_edges = np.histogram2d(
+            x[finite],
+            y[finite],
+            bins=bins
+        )
+        # log scale, since dense regions would otherwise drown out the rest
+        image_data = np.log1p(counts.T)
+        extent = (x_edges[0], x_edges[-1], y_edges[0], y_edges[-1])
+        self.scatter.set_visible(False)
+        self.image.set_visible(True)
+        self.image.set_data(image_data)
+        self.image.set_extent(extent)
+        self.image.set_clim(0, max(image_data.max(), 1))
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
@@ -1,14 +1,18 @@
-"""Kernel Part utilities for MavenWorks."""
+"""Kernel Part utilities for MavenWorks.
 
-from .DisplayHandle import name_display_handle
-from .interact_wrapper import wrap
+The built-in parts, ``wrap`` and ``gen_wrapper`` depend on libraries that are
+slow to import (like matplotlib and ipywidgets), so they're loaded on first
+use. The built-in parts are registered when the client first asks for the
+available parts.
+"""
+
+from .DisplayHandle import name_display_handle, ThrottledDisplayHandle
 from .KernelPart import register_part, KernelPart
 from .PartHelpers import Option, OptionsBag
-from .PyScatterPart import PyScatterPart
-from .WidgetWrapper import gen_wrapper
 
 __all__ = [
     "name_display_handle",
+    "ThrottledDisplayHandle",
     "wrap",
     "register_part",
     "KernelPart",
@@ -17,3 +21,32 @@ __all__ = [
     "PyScatterPart",
     "gen_wrapper"
 ]
+
+_builtins_loaded = False
+
+
+def _load_builtin_parts():
+    """Import (and so register) the parts that ship with MavenWorks."""
+    global _builtins_loaded, PyScatterPart, gen_wrapper
+    if _builtins_loaded:
+        return
+    _builtins_loaded = True
+    # these rebind the names that the submodule imports shadowed
+    from .PyScatterPart import PyScatterPart
+    from .WidgetWrapper import gen_wrapper
+
+
+def __getattr__(name):
+    global wrap
+    if name == "wrap":
+        from .interact_wrapper import wrap
+        return wrap
+    if name in ("PyScatterPart", "gen_wrapper"):
+        _load_builtin_parts()
+        return globals()[name]
+    raise AttributeError("module " + repr(__name__) + " has no attribute " +
+                         repr(name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
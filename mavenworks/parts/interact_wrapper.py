@@ -2,7 +2,11 @@
 
 from .KernelPart import KernelPart, register_part
 from ..serialization import guess_type, serialize
+from collections import OrderedDict
 from IPython.display import display
+from IPython.utils.capture import capture_output
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
 from uuid import uuid4
 
 __all__ = [
@@ -28,6 +32,9 @@ options_for_parts = {
     "CheckboxPart": ["Checked", {}]
 }
 
+# (fn, arg types, cache size, debounce) -> registered part name
+_wrapper_parts = {}
+
 
 def make_part(partType, global_binding_name):
     override, options = options_for_parts[partType] \
@@ -44,8 +51,44 @@ def make_part(partType, global_binding_name):
     }}
 
 
-def make_wrapper_part(fn, argTypes):
+def _cache_key(vals):
+    """Return a hashable key for a list of argument values.
+
+    Returns None if some value can't be hashed, in which case the result
+    shouldn't be cached.
+    """
+    key = []
+    for val in vals:
+        if isinstance(val, DataFrame):
+            # DataFrames aren't hashable, so hash their contents instead
+            try:
+                hashes = hash_pandas_object(val).values.tobytes()
+            except TypeError:
+                # unhashable cells, like lists
+                return None
+            key.append((
+                "DataFrame",
+                tuple(val.columns),
+                tuple(str(dtype) for dtype in val.dtypes),
+                hashes
+            ))
+            continue
+        try:
+            hash(val)
+        except TypeError:
+            return None
+        key.append(val)
+    return tuple(key)
+
+
+def make_wrapper_part(fn, argTypes, cache_size=0, debounce_ms=0):
+    reuse_key = (fn, tuple(argTypes), cache_size, debounce_ms)
+    if reuse_key in _wrapper_parts:
+        return _wrapper_parts[reuse_key]
     name = "__autogenerated_" + str(uuid4())
+    # argument key -> output, in LRU order
+    results = OrderedDict()
+
     @register_part(name)  # pylint: disable=unused-variable
     class AutoGeneratedPart(KernelPart):
         @classmethod
@@ -53,17 +96,36 @@ def make_wrapper_part(fn, argTypes):
             metadata = super().get_metadata()
             for i, argType in enumerate(argTypes):
                 metadata.add_option("arg" + str(i), None, argType)
+            metadata.debounce_ms = debounce_ms
 
             return metadata
 
         def render(self, opts):
             vals = [opts[arg] for arg in opts]
-            return fn(*vals)
-
+            if cache_size <= 0:
+                return fn(*vals)
+            key = _cache_key(vals)
+            if key is not None and key in results:
+                results.move_to_end(key)
+                return results[key]
+            # capture display()'d output too, so that it can be replayed
+            with capture_output() as capture:
+                result = fn(*vals)
+            if result is None and len(capture.outputs) > 0:
+                result = capture.outputs[0]
+            elif result is None:
+                result = capture.stdout + capture.stderr
+            if key is not None:
+                results[key] = result
+                while len(results) > cache_size:
+                    results.popitem(last=False)
+            return result
+
+    _wrapper_parts[reuse_key] = name
     return name
 
 
-def wrap(fn, *args):
+def wrap(fn, *args, cache=False, cache_size=128, debounce_ms=0):
     """Wrap a function with an interactive MavenWorks dashboard.
 
     :param fn: A function to wrap, that either returns or ``display()``s some
@@ -72,6 +134,19 @@ def wrap(fn, *args):
     :param args: The initial values to pass to the function. Each argument
     provided here will be bound to an input part.
 
+    :param cache: Whether to memoize the output of ``fn`` by its arguments,
+    so that revisiting a set of inputs (like dragging a slider back and forth)
+    doesn't call ``fn`` again. ``fn`` should be deterministic if this is set.
+
+    :param cache_size: The maximum number of outputs to memoize. The least
+    recently used outputs are evicted first.
+
+    :param debounce_ms: If greater than 0, the output waits for the inputs to
+    be still for this many milliseconds before re-rendering, instead of
+    rendering on every change.
+
+    Wrapping the same function with the same argument types and settings again
+    reuses the part created the first time, along with its cache.
     """
     parts = {}
     global_defs = []
@@ -102,7 +177,12 @@ def wrap(fn, *args):
             "uuid": str(uuid4()),
             "guid": part_id
         })
-    new_part = make_wrapper_part(fn, arg_types)
+    new_part = make_wrapper_part(
+        fn,
+        arg_types,
+        cache_size if cache else 0,
+        debounce_ms
+    )
     part_id = str(uuid4())
     parts[part_id] = {"application/vnd.maven.part+json": {
         "name": new_part,
@@ -7,23 +7,89 @@ All they do is convert between Python and JSON representations of objects.
 If you need conversions or pluggable serialization, reimplement this
 """
 import json
+import re
+import sys
+from collections import OrderedDict
 from itertools import chain
 from datetime import date, datetime
-from pandas import DataFrame
 from numbers import Real
 import math
-__supports_pyarrow = False
-__use_legacy_export = True
-try:
-    import pyarrow as pa
-    [major, minor, _] = pa.__version__.split(".")
-    if int(major) == 0 and int(minor) < 15:
-        # The JS library doesn't need extra support here
-        __use_legacy_export = False
-    from io import BytesIO
-    __supports_pyarrow = True
-except ImportError:
-    pass  # no PyArrow support
+from .settings import get_setting
+# pandas and pyarrow are slow to import, so they're only imported once a
+# table needs to be (de)serialized.
+_pyarrow = None  # (module or None, use legacy export), once detected
+_writer_kwargs = None  # kwargs for Arrow writers, built on first use
+# (columns, dtypes) -> Arrow schema, in LRU order
+_schema_cache = OrderedDict()
+_SCHEMA_CACHE_SIZE = 64
+
+
+def _parse_version(version):
+    """Return the (major, minor) version from a string like '15.0.0.dev1'."""
+    match = re.match(r"(\d+)\.(\d+)", version)
+    if match is None:
+        return (0, 0)
+    return (int(match.group(1)), int(match.group(2)))
+
+
+def _get_pyarrow():
+    """Return (pyarrow, use legacy export), or (None, _) if unsupported."""
+    global _pyarrow
+    if _pyarrow is not None:
+        return _pyarrow
+    try:
+        import pyarrow as pa
+        # The JS library doesn't need extra support before 0.15
+        use_legacy_export = _parse_version(pa.__version__) >= (0, 15)
+        _pyarrow = (pa, use_legacy_export)
+    except ImportError:
+        _pyarrow = (None, False)  # no PyArrow support
+    return _pyarrow
+
+
+def _get_writer_kwargs(pa, use_legacy_export):
+    """Return the kwargs to construct Arrow IPC writers with.
+
+    These are built once, from the ``arrow_compression`` setting.
+    """
+    global _writer_kwargs
+    if _writer_kwargs is not None:
+        return _writer_kwargs
+    ipc = getattr(pa, "ipc", None)
+    if ipc is not None and hasattr(ipc, "IpcWriteOptions"):
+        _writer_kwargs = {"options": ipc.IpcWriteOptions(
+            use_legacy_format=use_legacy_export,
+            compression=get_setting("arrow_compression")
+        )}
+    elif use_legacy_export:
+        # pyarrow < 2.0 takes this on the writer, and can't compress
+        _writer_kwargs = {"use_legacy_format": True}
+    else:
+        _writer_kwargs = {}
+    return _writer_kwargs
+
+
+def _get_schema(pa, df, refresh=False):
+    """Return the Arrow schema for a DataFrame.
+
+    Schemas are cached by column names and dtypes, since converting them is
+    a large part of serializing small tables.
+    """
+    key = (tuple(df.columns), tuple(df.dtypes))
+    if not refresh and key in _schema_cache:
+        _schema_cache.move_to_end(key)
+        return _schema_cache[key]
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    _schema_cache[key] = schema
+    while len(_schema_cache) > _SCHEMA_CACHE_SIZE:
+        _schema_cache.popitem(last=False)
+    return schema
+
+
+def _is_dataframe(obj, compare=isinstance):
+    # if pandas hasn't been imported, obj can't be a DataFrame
+    pd = sys.modules.get("pandas", None)
+    return pd is not None and compare(obj, pd.DataFrame)
 
 
 class PassThrough:
@@ -37,20 +103,37 @@ class PassThrough:
 
 
 def _serialize_table(obj):
-    if __supports_pyarrow:
+    pa, use_legacy_export = _get_pyarrow()
+    if pa is not None:
         try:
-            f = BytesIO()
-            data = pa.Table.from_pandas(obj, preserve_index=False)
-            if __use_legacy_export:
-                batch_writer = pa.RecordBatchFileWriter(f, data.schema, use_legacy_format=True)
+            try:
+                data = pa.Table.from_pandas(
+                    obj,
+                    schema=_get_schema(pa, obj),
+                    preserve_index=False
+                )
+            except (pa.ArrowException, TypeError, ValueError):
+                # object columns can hold different types than last time
+                data = pa.Table.from_pandas(
+                    obj,
+                    schema=_get_schema(pa, obj, refresh=True),
+                    preserve_index=False
+                )
+            if get_setting("arrow_ipc_format") == "stream":
+                writer_cls = pa.RecordBatchStreamWriter
             else:
-                batch_writer = pa.RecordBatchFileWriter(f, data.schema)
-            with batch_writer as writer:
+                writer_cls = pa.RecordBatchFileWriter
+            sink = pa.BufferOutputStream()
+            with writer_cls(
+                sink,
+                data.schema,
+                **_get_writer_kwargs(pa, use_legacy_export)
+            ) as writer:
                 writer.write_table(data)
             return {
                 "arrow": True,
                 # Tornado will encode this
-                "data": f.getvalue()
+                "data": sink.getvalue().to_pybytes()
             }
         except Exception as e:
             print("Failed to serialize to Arrow")
@@ -87,6 +170,8 @@ def _serialize_table(obj):
 
 
 def _deserialize_table(obj):
+    from pandas import DataFrame
+
     def _deserialize_val(val, idx: int):
         try:
             # if this fails, val doesn't have typeName
@@ -173,7 +258,7 @@ def guess_type(obj, check_instanceof=True):
     """Make a best guess as to what the MavenWorks equivalent type might be"""
     # ordered in decreasing certainty/specificity
     compare = isinstance if check_instanceof else issubclass
-    if compare(obj, DataFrame):
+    if _is_dataframe(obj, compare):
         return "Table"
     if compare(obj, BaseException):
         return "Error"
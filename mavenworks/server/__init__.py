@@ -2,8 +2,13 @@
 
 from tornado.web import StaticFileHandler
 from notebook.utils import url_path_join
-from .local_config import LocalConfig
+from .config_events import ConfigEvents
+from .config_cache import ConfigIndexCache
+from .config_index import ConfigObjectIndex, ConfigObjectWatcher
+from .local_config import ConfigObject, ConfigQueryExecutor, LocalConfig
+from ..settings import get_setting
 from .viewer import ViewerApp, ViewerIndex
+import hashlib
 import os
 
 
@@ -12,11 +17,39 @@ def load_jupyter_server_extension(nb_app):
     host_pattern = '.*$'
     web_app = nb_app.web_app
     base_url = web_app.settings["base_url"]
+    cache = None
+    if get_setting("config_index_cache"):
+        # one cache per root, so that servers in different roots don't clash
+        root_hash = hashlib.sha1(os.path.abspath(".").encode("utf-8"))
+        cache = ConfigIndexCache(os.path.join(
+            nb_app.runtime_dir,
+            "mavenworks-config-" + root_hash.hexdigest()[:12] + ".db"
+        ))
+    index = ConfigObjectIndex(
+        ".",
+        cache=cache,
+        read_threads=get_setting("config_read_threads")
+    )
+    poll_interval = get_setting("config_poll_interval")
+    if poll_interval:
+        ConfigObjectWatcher(index, poll_interval, logger=nb_app.log).start()
+    executor = ConfigQueryExecutor(
+        index,
+        max_workers=get_setting("config_max_concurrent_scans")
+    )
     web_app.add_handlers(host_pattern, [
         (
             url_path_join(base_url, r"/serverconfig/?$"),
             LocalConfig,
-            {"logger": nb_app.log}
+            {"logger": nb_app.log, "executor": executor}
+        ), (
+            url_path_join(base_url, r"/serverconfig/object/?$"),
+            ConfigObject,
+            {"logger": nb_app.log, "executor": executor}
+        ), (
+            url_path_join(base_url, r"/serverconfig/events/?$"),
+            ConfigEvents,
+            {"logger": nb_app.log, "executor": executor}
         ), (
             url_path_join(base_url, "/view/", r".*$"),
             ViewerApp
@@ -0,0 +1,111 @@
+"""On-disk persistence for the config index."""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+#: Bump this whenever the schema or the header format changes.
+SCHEMA_VERSION = 1
+
+
+class CachedEntry(NamedTuple):
+    """A config index entry, as stored on disk."""
+
+    mtime: int
+    size: int
+    obj: Optional[dict]
+
+
+class ConfigIndexCache:
+    """Persists a :class:`ConfigObjectIndex` to a SQLite database.
+
+    Only the stat data and header fields of each object are stored, since
+    those are all a restarted server needs to answer listings. Bodies are
+    read lazily, as usual. Restored entries are validated by the index's next
+    refresh, which only re-parses files whose mtime or size has changed.
+
+    The cache is tied to a config root; a cache written for one root will not
+    be loaded for another.
+    """
+
+    def __init__(self, cache_file: str):
+        """Create a new cache, backed by the given file.
+
+        The file (and its parent directory) are created on first save.
+        """
+        self.cache_file = cache_file
+
+    def load(self, root_dir: str) -> Tuple[Dict[str, CachedEntry], List[str]]:
+        """Load the cached entries and tracked directories for a root.
+
+        If there is no usable cache for this root, returns empty results.
+        """
+        if not os.path.exists(self.cache_file):
+            return {}, []
+        with closing(self._connect()) as conn, conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if (meta.get("version") != str(SCHEMA_VERSION)
+                    or meta.get("root_dir") != root_dir):
+                return {}, []
+            entries = {
+                path: CachedEntry(
+                    mtime,
+                    size,
+                    json.loads(header) if header is not None else None
+                )
+                for path, mtime, size, header in conn.execute(
+                    "SELECT path, mtime, size, header FROM entries"
+                )
+            }
+            tracked = [
+                row[0] for row in conn.execute("SELECT dir FROM tracked")
+            ]
+        return entries, tracked
+
+    def save(self,
+             root_dir: str,
+             entries: Dict[str, CachedEntry],
+             tracked: List[str]):
+        """Replace the contents of the cache."""
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM meta")
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM tracked")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("version", str(SCHEMA_VERSION)),
+                ("root_dir", root_dir),
+            ])
+            conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", [
+                (
+                    path,
+                    entry.mtime,
+                    entry.size,
+                    json.dumps(entry.obj) if entry.obj is not None else None
+                ) for path, entry in entries.items()
+            ])
+            conn.executemany(
+                "INSERT INTO tracked VALUES (?)",
+                [(d,) for d in tracked]
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.cache_file)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                mtime INTEGER,
+                size INTEGER,
+                header TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tracked (
+                dir TEXT PRIMARY KEY
+            );
+        """)
+        return conn
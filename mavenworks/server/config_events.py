@@ -0,0 +1,84 @@
+"""Websocket handler for pushing config changes to clients."""
+
+import json
+from tornado import web
+from tornado.ioloop import IOLoop
+from tornado.websocket import WebSocketHandler
+from notebook.base.handlers import IPythonHandler
+from notebook.base.zmqhandlers import WebSocketMixin
+from .local_config import ConfigQueryExecutor
+
+
+class ConfigEvents(WebSocketMixin, WebSocketHandler, IPythonHandler):
+    """Notifies clients when config objects are added, modified, or removed.
+
+    Clients connect with a ``path`` argument, with the same meaning as in
+    :class:`LocalConfig`. From then on, the handler sends a message for every
+    change to a config object visible from that path, in the form:
+
+    .. code-block:: json
+
+        {"event": "added", "obj": {"id": "...", "path": "/parts/Foo.part"}}
+
+    where ``event`` is one of ``"added"``, ``"modified"``, or ``"removed"``,
+    and ``obj`` holds the header fields of the object. Clients can then fetch
+    the new definition from ``/serverconfig/object``.
+
+    Changes are found by the :class:`ConfigObjectWatcher`, so they are
+    delayed by up to one poll interval.
+    """
+
+    def initialize(self, logger=None, executor=None):
+        """Initialize the handler. Takes the same kwargs as LocalConfig."""
+        self.logger = logger
+        self.executor: ConfigQueryExecutor = executor
+        self.scope = "."
+        self.closed = False
+        self._loop = IOLoop.current()
+
+    def get(self, *args, **kwargs):
+        """Upgrade the connection, if the user is authenticated."""
+        if not self.get_current_user():
+            raise web.HTTPError(403)
+        return super().get(*args, **kwargs)
+
+    async def open(self, *args, **kwargs):
+        """Start listening for changes in the requested scope."""
+        # starts the keepalive pings, since this socket is idle between
+        # changes and proxies would otherwise drop it
+        super().open(*args, **kwargs)
+        self.scope = self.get_argument("path", ".")
+        try:
+            # make sure the scope is tracked, so the watcher will see changes
+            await self.executor.get_objects_in_tree(self.scope, True)
+        except Exception:
+            self.logger.exception("Watching config failed")
+            self.close()
+            return
+        if self.closed:
+            # the client left while we were waiting, and on_close already ran
+            return
+        self.executor.index.add_listener(self._on_change)
+
+    def on_message(self, message):
+        """Ignore messages, as this is a push-only channel."""
+        pass
+
+    def on_close(self):
+        """Stop listening for changes."""
+        self.closed = True
+        self.executor.index.remove_listener(self._on_change)
+
+    def _on_change(self, event: str, path: str, header: dict):
+        # this is called from the watcher thread
+        if not self.executor.index.is_visible(self.scope, path):
+            return
+        self._loop.add_callback(self._send_change, event, header)
+
+    def _send_change(self, event: str, header: dict):
+        if self.ws_connection is None:
+            return
+        self.write_message(json.dumps({
+            "event": event,
+            "obj": header
+        }))
@@ -0,0 +1,453 @@
+"""In-memory index of config objects, kept current by a file watcher."""
+
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from .config_cache import CachedEntry, ConfigIndexCache
+from .config_object_tracker import ConfigObjectTracker, parts_dir
+
+
+class _IndexEntry(NamedTuple):
+    """Internal record for an indexed ``.part`` file.
+
+    ``obj`` holds just the header fields of the object, and ``body`` holds the
+    full object once something has asked for it.
+    """
+
+    mtime: int
+    size: int
+    obj: Optional[dict]
+    body: Optional[dict] = None
+
+
+ChangeListener = Callable[[str, str, dict], None]
+
+
+class ConfigObjectIndex:
+    """A cache of config objects, keyed by absolute file path.
+
+    The :class:`ConfigObjectTracker` re-walks the directory tree and re-parses
+    every ``.part`` file on each query. That's fine for small deployments, but
+    gets slow on big shared drives with thousands of notebooks. The index
+    instead remembers every ``.part`` file it has seen, along with that file's
+    mtime and size. Refreshes only re-parse files whose stat data changed, and
+    queries are answered directly from the index.
+
+    Only the header fields of each object are read while scanning, which means
+    that big ``.part`` files (such as parts with lots of embedded HTML) are
+    cheap to index. Bodies are read lazily, the first time a query needs them.
+
+    Directories are indexed lazily: the first query for a scope scans that
+    directory, and from then on it is "tracked". Tracked directories are kept
+    current by :meth:`refresh`, which is called either periodically by a
+    :class:`ConfigObjectWatcher` or (if no watcher is running) on every query.
+
+    The index can optionally be persisted with a :class:`ConfigIndexCache`, so
+    that a restarted server can answer listings without re-reading every file.
+
+    Ordering follows the same rules as
+    :meth:`ConfigObjectTracker.get_objects_in_tree`: global objects come
+    first, then scoped objects. Within a scope, objects are sorted by path.
+    """
+
+    def __init__(self, root_dir: str, global_dir: str = parts_dir,
+                 cache: Optional[ConfigIndexCache] = None,
+                 read_threads: int = 1):
+        """Create a new index.
+
+        :param root_dir: The root of the config (usually the Jupyter root)
+        :param global_dir: The global parts folder, relative to ``root_dir``
+        :param cache: An optional on-disk cache. If given, the index starts
+        with the contents of the cache, and saves to it after every change.
+        :param read_threads: The number of threads to read files with during
+        a refresh. More threads help on network drives, where the latency of
+        each read matters more than throughput.
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.global_dir = os.path.join(self.root_dir, global_dir)
+        self.watched = False
+        self.cache = cache
+        self._files: Dict[str, _IndexEntry] = {}
+        self._tracked_dirs: List[str] = []
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._read_pool = None
+        if read_threads > 1:
+            self._read_pool = ThreadPoolExecutor(
+                max_workers=read_threads,
+                thread_name_prefix="mavenworks-config-read"
+            )
+        if cache is not None:
+            self._load_cache()
+
+    def add_listener(self, listener: ChangeListener):
+        """Add a callback to be notified of changes to the index.
+
+        Listeners are called with the kind of change (one of ``"added"``,
+        ``"modified"``, or ``"removed"``), the absolute path of the changed
+        file, and the header of the object. Removals pass the last-known
+        header of the object.
+
+        .. note::
+            Listeners are called from whichever thread refreshed the index,
+            which is usually the watcher thread.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        """Remove a listener added by :meth:`add_listener`."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def is_visible(self, cwd: str, path: str) -> bool:
+        """Return whether an indexed file is visible from a scoped path."""
+        work_dir = self.resolve_scope(cwd)
+        return self._is_under(path, work_dir) or (
+            work_dir != self.root_dir and self._is_under(path, self.global_dir)
+        )
+
+    def get_objects_in_tree(self, cwd: str,
+                            headers_only=False) -> List[dict]:
+        """Return the config objects visible from a scoped path.
+
+        See :meth:`ConfigObjectTracker.get_objects_in_tree` for details on
+        scoping and shadowing.
+
+        :param cwd: The scoped path, relative to the root of the config
+        :param headers_only: If True, only return the header fields of each
+        object (the id, typeName, name, path, and lastModified time). Bodies
+        aren't parsed, so an object with a malformed body is listed until
+        something reads it in full, at which point it's dropped.
+        """
+        data = []
+        for scope in self._prepare_scopes(cwd):
+            data += self._objects_under(scope, headers_only)
+        return data
+
+    def get_object(self, cwd: str, obj_id: str,
+                   headers_only=False) -> Optional[dict]:
+        """Return a single config object visible from a scoped path.
+
+        If more than one visible object has the given id, the one that would
+        shadow the others is returned. If no visible object has that id,
+        returns None.
+
+        :param cwd: The scoped path, relative to the root of the config
+        :param obj_id: The id of the config object
+        :param headers_only: If True, only return the header fields
+        """
+        match = None
+        for scope in self._prepare_scopes(cwd):
+            for path, entry in self._entries_under(scope):
+                if entry.obj["id"] == obj_id:
+                    match = (path, entry)
+        if match is None:
+            return None
+        path, entry = match
+        if headers_only:
+            return entry.obj
+        return entry.body or self._load_body(path, entry)
+
+    def resolve_scope(self, cwd: str) -> str:
+        """Resolve a request path into an absolute working directory."""
+        # strip any leading slash
+        cwd = cwd[1:] if cwd.startswith("/") else cwd
+        work_dir = os.path.abspath(os.path.join(self.root_dir, cwd))
+        if not work_dir.startswith(self.root_dir):
+            msg = "Working directory must be under Jupyter root! Got: "
+            msg += work_dir
+            raise Exception(msg)
+        return work_dir
+
+    def _prepare_scopes(self, cwd: str) -> List[str]:
+        """Resolve the scopes visible from ``cwd``, refreshing if needed."""
+        work_dir = self.resolve_scope(cwd)
+        scopes = [work_dir]
+        if work_dir != self.root_dir:
+            scopes.insert(0, self.global_dir)
+        for scope in scopes:
+            if not self.track(scope) and not self.watched:
+                self.refresh(scope)
+        return scopes
+
+    def track(self, directory: str) -> bool:
+        """Start tracking a directory, scanning it if it's new to the index.
+
+        Returns True if the directory was scanned as a result of this call, or
+        False if it was already covered by a tracked directory.
+        """
+        with self._lock:
+            if self._is_tracked(directory):
+                return False
+        # No notifications here, since nothing could have been listening
+        self.refresh(directory, notify=False)
+        with self._lock:
+            # drop any tracked subtrees, since the new dir covers them
+            self._tracked_dirs = [
+                d for d in self._tracked_dirs
+                if not self._is_under(d, directory)
+            ] + [directory]
+            self._dirty = True
+        self._save_cache()
+        return True
+
+    def refresh(self, directory: Optional[str] = None, notify=True):
+        """Rescan a directory (or all tracked directories) for changes.
+
+        Files whose mtime and size are unchanged keep their cached object,
+        so a refresh of an unchanged tree costs one ``stat`` per file.
+
+        :param directory: The directory to rescan, or None to rescan all
+        tracked directories.
+        :param notify: Whether to notify listeners of any changes found.
+        """
+        if directory is None:
+            with self._lock:
+                dirs = list(self._tracked_dirs)
+            for tracked_dir in dirs:
+                self.refresh(tracked_dir, notify)
+            return
+        with self._lock:
+            known = dict(self._files)
+        found: Dict[str, _IndexEntry] = {}
+        self._scan(directory, known, found)
+        changes: List[Tuple[str, str, dict]] = []
+        with self._lock:
+            for path in list(self._files.keys()):
+                if self._is_under(path, directory) and path not in found:
+                    old = self._files.pop(path)
+                    self._dirty = True
+                    if old.obj is not None:
+                        changes.append(("removed", path, old.obj))
+            for path, entry in found.items():
+                old = self._files.get(path, None)
+                if old is not None and (old.mtime, old.size) == (entry.mtime,
+                                                                 entry.size):
+                    # unchanged, keep the old entry (which may cache a body)
+                    continue
+                self._files[path] = entry
+                self._dirty = True
+                change = _classify_change(old, entry)
+                if change is not None:
+                    changes.append((change, path, (entry.obj or old.obj)))
+            listeners = list(self._listeners) if notify else []
+        self._save_cache()
+        for change in changes:
+            for listener in listeners:
+                listener(*change)
+
+    def _load_cache(self):
+        try:
+            entries, tracked = self.cache.load(self.root_dir)
+        except Exception as e:
+            # a broken cache just means a cold start
+            warnings.warn("Failed to load config index cache: " + str(e))
+            return
+        with self._lock:
+            self._files = {
+                path: _IndexEntry(*entry) for path, entry in entries.items()
+            }
+            self._tracked_dirs = tracked
+
+    def _save_cache(self):
+        if self.cache is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            entries = {
+                path: CachedEntry(entry.mtime, entry.size, entry.obj)
+                for path, entry in self._files.items()
+            }
+            tracked = list(self._tracked_dirs)
+        try:
+            self.cache.save(self.root_dir, entries, tracked)
+        except Exception as e:
+            warnings.warn("Failed to save config index cache: " + str(e))
+
+    def _scan(self, directory: str,
+              known: Dict[str, _IndexEntry],
+              found: Dict[str, _IndexEntry]):
+        to_read: List[Tuple[str, os.stat_result]] = []
+        self._walk(directory, known, found, to_read)
+        if self._read_pool is not None and len(to_read) > 1:
+            # On network drives, per-file latency dominates, so fan the reads
+            # out. ``map`` yields in submission order, which keeps this
+            # deterministic.
+            entries = self._read_pool.map(self._read_header, to_read)
+        else:
+            entries = map(self._read_header, to_read)
+        for (path, _), entry in zip(to_read, entries):
+            found[path] = entry
+
+    def _walk(self, directory: str,
+              known: Dict[str, _IndexEntry],
+              found: Dict[str, _IndexEntry],
+              to_read: List[Tuple[str, os.stat_result]]):
+        """Walk a directory, sorting files into cache hits and ones to read."""
+        try:
+            child_iter = os.scandir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            # The folder doesn't exist (yet), so there's nothing to index
+            return
+        with child_iter:
+            for entry in child_iter:
+                if entry.name.startswith("."):  # Ignore hidden files+dirs
+                    continue
+                if entry.is_dir():
+                    self._walk(entry.path, known, found, to_read)
+                    continue
+                if os.path.splitext(entry.name)[1] != ".part":
+                    continue
+                stat = entry.stat()
+                cached = known.get(entry.path, None)
+                if (cached is not None
+                        and cached.mtime == stat.st_mtime_ns
+                        and cached.size == stat.st_size):
+                    found[entry.path] = cached
+                    continue
+                to_read.append((entry.path, stat))
+
+    def _read_header(self, item: Tuple[str, os.stat_result]) -> _IndexEntry:
+        path, stat = item
+        _, obj = ConfigObjectTracker.try_read_path(
+            path,
+            self.root_dir,
+            stat=stat,
+            headers_only=True
+        )
+        # Malformed parts are recorded too, so that we don't re-parse them
+        # until they change
+        return _IndexEntry(stat.st_mtime_ns, stat.st_size, obj)
+
+    def _entries_under(self,
+                       directory: str) -> List[Tuple[str, _IndexEntry]]:
+        with self._lock:
+            entries = [
+                (path, entry) for path, entry in self._files.items()
+                if entry.obj is not None and self._is_under(path, directory)
+            ]
+        entries.sort(key=lambda item: item[0])
+        return entries
+
+    def _objects_under(self, directory: str,
+                       headers_only: bool) -> List[dict]:
+        entries = self._entries_under(directory)
+        if headers_only:
+            return [entry.obj for _, entry in entries]
+        objs = []
+        for path, entry in entries:
+            body = entry.body or self._load_body(path, entry)
+            if body is not None:
+                objs.append(body)
+        return objs
+
+    def _load_body(self, path: str, entry: _IndexEntry) -> Optional[dict]:
+        """Read the full object for an indexed file, and cache it."""
+        try:
+            stat = os.stat(path)
+            _, body = ConfigObjectTracker.try_read_path(
+                path,
+                self.root_dir,
+                stat=stat
+            )
+        except FileNotFoundError:
+            # deleted since the last refresh, the next one will drop it
+            return None
+        dropped = False
+        with self._lock:
+            # If the file changed since it was indexed, don't cache the body.
+            # The next refresh will pick up the change (and notify listeners).
+            if (self._files.get(path, None) is entry
+                    and (entry.mtime, entry.size) == (stat.st_mtime_ns,
+                                                      stat.st_size)):
+                if body is not None:
+                    self._files[path] = entry._replace(body=body)
+                else:
+                    # The header was sniffed fine, but the body is malformed.
+                    # Drop it from header listings too, so that they agree
+                    # with full listings, until the file changes.
+                    self._files[path] = entry._replace(obj=None)
+                    self._dirty = True
+                    dropped = True
+                    listeners = list(self._listeners)
+        if dropped:
+            self._save_cache()
+            for listener in listeners:
+                listener("removed", path, entry.obj)
+        return body
+
+    def _is_tracked(self, directory: str) -> bool:
+        return any(
+            self._is_under(directory, tracked)
+            for tracked in self._tracked_dirs
+        )
+
+    @staticmethod
+    def _is_under(path: str, directory: str) -> bool:
+        return path == directory or path.startswith(
+            os.path.join(directory, "")
+        )
+
+
+def _classify_change(old: Optional[_IndexEntry],
+                     new: _IndexEntry) -> Optional[str]:
+    """Describe how an index entry changed, from a listener's perspective."""
+    was_obj = old is not None and old.obj is not None
+    if new.obj is None:
+        # malformed parts aren't visible to clients
+        return "removed" if was_obj else None
+    return "modified" if was_obj else "added"
+
+
+class ConfigObjectWatcher:
+    """Polls a :class:`ConfigObjectIndex` on a background thread.
+
+    Polling is used instead of inotify and friends since it works the same on
+    every platform, and on network drives (which often don't send change
+    events). Each poll only costs a ``stat`` per unchanged file.
+    """
+
+    def __init__(self, index: ConfigObjectIndex, interval: float,
+                 logger=None):
+        """Create a new watcher. Call :meth:`start` to begin polling.
+
+        :param index: The index to keep current
+        :param interval: The number of seconds to wait between polls
+        :param logger: An optional logger, for reporting errors
+        """
+        self.index = index
+        self.interval = interval
+        self.logger = logger
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="mavenworks-config-watcher",
+            daemon=True
+        )
+
+    def start(self):
+        """Start polling for changes."""
+        self.index.watched = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling. Queries against the index will refresh it instead."""
+        self._stopped.set()
+        self.index.watched = False
+
+    def _run(self):
+        # Refresh right away, in case the index was restored from a cache
+        while not self._stopped.is_set():
+            try:
+                self.index.refresh()
+            except Exception:
+                if self.logger is not None:
+                    self.logger.exception("Refreshing config index failed")
+            self._stopped.wait(self.interval)
@@ -2,23 +2,80 @@
 
 import os
 import json
+import re
 import warnings
+from json.decoder import scanstring
 from ..settings import get_setting
 
 parts_dir = get_setting("global_parts_folder")
 
+#: The fields of a config object that can be read without reading its body.
+HEADER_FIELDS = ("id", "typeName")
+#: How many characters to read when sniffing a file for its header fields.
+SNIFF_SIZE = 4096
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def _sniff_fields(f, fields) -> dict:
+    """Read a set of top-level fields from a JSON object in a file. Internal.
+
+    Config objects are serialized with their header fields first, so this
+    usually only needs to read and decode the first few hundred characters of
+    the file, skipping the (potentially huge) body entirely. If the fields
+    aren't found at the beginning of the file, this falls back to parsing the
+    whole file.
+
+    Keys that aren't in ``fields`` are missing from the returned dict, even if
+    they're in the file.
+    """
+    text = f.read(SNIFF_SIZE)
+    at_eof = len(text) < SNIFF_SIZE
+    found = {}
+    try:
+        idx = _whitespace.match(text, 0).end()
+        if text[idx] != "{":
+            raise json.JSONDecodeError("Expecting '{'", text, idx)
+        idx += 1
+        while len(found) < len(fields):
+            idx = _whitespace.match(text, idx).end()
+            if text[idx] == "}":
+                return found
+            if text[idx] == ",":
+                idx = _whitespace.match(text, idx + 1).end()
+            if text[idx] != '"':
+                raise json.JSONDecodeError("Expecting key", text, idx)
+            key, idx = scanstring(text, idx + 1)
+            idx = _whitespace.match(text, idx).end()
+            if text[idx] != ":":
+                raise json.JSONDecodeError("Expecting ':'", text, idx)
+            idx = _whitespace.match(text, idx + 1).end()
+            value, idx = _decoder.raw_decode(text, idx)
+            if idx >= len(text) and not at_eof:
+                # the value might have been cut off by the buffer
+                raise json.JSONDecodeError("Truncated value", text, idx)
+            if key in fields:
+                found[key] = value
+        return found
+    except (json.JSONDecodeError, IndexError):
+        if at_eof:
+            raise json.JSONDecodeError("Malformed config object", text, 0)
+    # The header was cut off by the sniff buffer, so read the whole thing
+    data = json.loads(text + f.read())
+    if not isinstance(data, dict):
+        raise json.JSONDecodeError("Expecting object", text, 0)
+    return {key: data[key] for key in fields if key in data}
+
 
 class ConfigObjectTracker:
     """Class to sniff all the config objects in a directory.
 
-    For the first cut, there's no file watching or update msgs. We could add
-    it, but for now YAGNI applies as there's no need for any editors to be
-    aware of config staleness (as they just use file i/o directly).
-
-    The use case for update msgs would be for updating a downstream cache,
-    which is a likely future optimization (especially if we needed to use
-    this in large-scale deployments- the current approach of checking on every
-    query works is just fine for small-scale and individual deployments).
+    The tracker itself has no file watching or update msgs, and checks the
+    filesystem on every query. That works just fine for small-scale and
+    individual deployments. Larger deployments should use the
+    :class:`ConfigObjectIndex` instead, which caches the objects found here
+    and is kept current by a file watcher.
     """
 
     @staticmethod
@@ -88,14 +145,46 @@ class ConfigObjectTracker:
         :param base_path: The base path of the config, where "/" is the root of
         the config.
         """
-        name, ext = os.path.splitext(dir_entry.path)
+        _, ext = os.path.splitext(dir_entry.path)
         if dir_entry.is_dir() or ext != ".part":
             return (False, None)
         file_path = os.path.join(base_path, scan_dir, dir_entry.path)
+        return ConfigObjectTracker.try_read_path(
+            file_path,
+            base_path,
+            stat=dir_entry.stat()
+        )
+
+    @staticmethod
+    def try_read_path(file_path: str,
+                      base_path: str,
+                      stat: os.stat_result = None,
+                      headers_only=False):
+        """Attempt to read a config object from a file path.
+
+        Returns a tuple of (True, JSON dict) if the file is a Maven config
+        object, and (False, None) if it could be read but wasn't one. Read
+        errors (such as permission errors) are raised to the caller.
+
+        :param file_path: The path of the ``.part`` file to read
+        :param base_path: The base path of the config, where "/" is the root of
+        the config.
+        :param stat: The file's stat data, if the caller already has it (such
+        as from ``DirEntry.stat()``)
+        :param headers_only: If True, only read the header fields (see
+        :data:`HEADER_FIELDS`). Bodies like ``data`` and ``arguments`` will be
+        left out, and need not be parsed at all.
+        """
+        name, _ = os.path.splitext(file_path)
         try:
             with open(file_path, 'r') as f:
-                data = json.load(f)
+                if headers_only:
+                    data = _sniff_fields(f, HEADER_FIELDS)
+                else:
+                    data = json.load(f)
                 path = ConfigObjectTracker.__norm_path(file_path, base_path)
+                if stat is None:
+                    stat = os.stat(file_path)
                 # return a corrected dict
                 obj = {
                     # todo: Should we generate a uuid1 from the file's inode?
@@ -110,10 +199,12 @@ class ConfigObjectTracker:
                     # Because this is a directory store, we can safely ignore
                     # whatever the file says is true, because the filesystem
                     # is more accurate in these regards
-                    "lastModified": os.path.getmtime(file_path),
+                    "lastModified": stat.st_mtime,
                     "name": os.path.basename(name),
                     "path": path,
                 }
+                if headers_only:
+                    return (True, obj)
                 if "data" in data:
                     # this is a FileConfigObject, attach the data
                     obj["data"] = data["data"]
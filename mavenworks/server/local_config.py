@@ -1,49 +1,205 @@
-"""Tornado handler for tracking Maven config (just UDPs for now)."""
+"""Tornado handlers for tracking Maven config (just UDPs for now)."""
 
+import hashlib
+import json
 import traceback
+from asyncio import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List
 from notebook.base.handlers import IPythonHandler
-from .config_object_tracker import ConfigObjectTracker
+from tornado.ioloop import IOLoop
+from .config_index import ConfigObjectIndex
+
+
+class ConfigQueryExecutor:
+    """Runs config index queries on a thread pool, off the IOLoop.
+
+    Scans can take a while on large trees, and would otherwise stall every
+    other request on the server. Concurrent queries for the same scope are
+    merged into a single scan, and the pool size caps how many scans may hit
+    the disk at once.
+
+    .. note::
+        This class is not thread-safe, and must only be used from the IOLoop.
+    """
+
+    def __init__(self, index: ConfigObjectIndex, max_workers: int = 4):
+        """Create a new query executor.
+
+        :param index: The config index to query
+        :param max_workers: The maximum number of concurrent scans
+        """
+        self.index = index
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="mavenworks-config"
+        )
+        self._pending: Dict[Hashable, Future] = {}
+
+    async def get_objects_in_tree(self, cwd: str, headers_only=False):
+        """Query the index for all objects visible from ``cwd``.
+
+        See :meth:`ConfigObjectIndex.get_objects_in_tree`.
+        """
+        key = ("tree", self.index.resolve_scope(cwd), headers_only)
+        return await self._run(
+            key,
+            self.index.get_objects_in_tree,
+            cwd,
+            headers_only
+        )
+
+    async def get_object(self, cwd: str, obj_id: str, headers_only=False):
+        """Query the index for a single object visible from ``cwd``.
+
+        See :meth:`ConfigObjectIndex.get_object`.
+        """
+        key = ("object", self.index.resolve_scope(cwd), obj_id, headers_only)
+        return await self._run(
+            key,
+            self.index.get_object,
+            cwd,
+            obj_id,
+            headers_only
+        )
+
+    def _run(self, key: Hashable, fn, *args) -> Future:
+        pending = self._pending.get(key, None)
+        if pending is None:
+            pending = IOLoop.current().run_in_executor(
+                self._executor,
+                fn,
+                *args
+            )
+            self._pending[key] = pending
+            pending.add_done_callback(
+                lambda _: self._pending.pop(key, None)
+            )
+        return pending
+
+
+def _compute_config_etag(headers: List[dict], variant: str) -> str:
+    """Compute an ETag for a set of config objects, using only their headers.
+
+    Since the headers include the lastModified time of each object, this tag
+    changes whenever an object is added, removed, moved, or edited. The
+    ``variant`` distinguishes different representations of the same objects,
+    such as a listing with and without bodies.
+    """
+    digest = hashlib.sha1(variant.encode("utf-8"))
+    for header in headers:
+        digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+    return '"' + digest.hexdigest() + '"'
 
 
 class LocalConfig(IPythonHandler):
     """Provides information on config objects via HTTP.
 
-    Requestors can fetch all UDP definitions, and that's about it right now.
+    Requestors can list config objects (with or without their definitions),
+    and fetch definitions of single objects using :class:`ConfigObject`.
+
+    Config objects are served from a :class:`ConfigObjectIndex`, which caches
+    definitions and is kept current by a file watcher. Queries run on a
+    :class:`ConfigQueryExecutor`, so that the server stays responsive while
+    scanning.
+
+    Responses carry an ETag derived from the listing, so that clients can
+    send ``If-None-Match`` and get a cheap 304 if nothing has changed.
+
+    Clients that need to stay current can subscribe to changes with
+    :class:`ConfigEvents`, instead of polling this handler.
 
     Later passes might add:
       - Read from additional directories
-      - Read paths only, and definitions later
-      - Read and cache definitions
-      - Notify on cache updates
       etc.
     """
 
-    def __init__(self, *args, logger=None, **kwargs):
+    def __init__(self, *args, logger=None, executor=None, **kwargs):
         """Initialize the HTTP router.
 
-        Takes a logger object as a kwarg for recording errors.
+        Takes a logger object as a kwarg for recording errors, and the query
+        executor to run config searches on.
         """
         super().__init__(*args, **kwargs)
         self.logger = logger
+        self.executor: ConfigQueryExecutor = executor
 
-    def get(self):
+    async def get(self):
         """Given a working directory, look for any UDPs in the filesystem.
 
         Parts may live in <Jupyter root>/parts and <workdir>. This means that
         parts can be defined alongside the notebooks that reference them, but
         not above (unless placed into that global /parts folder).
+
+        If the ``headers_only`` argument is set, only the header fields of
+        each object are returned (skipping bodies like ``data``). Clients can
+        then fetch the bodies they need from ``/serverconfig/object``.
         """
-        data = []
         path = self.get_argument("path", ".")
+        headers_only = self.get_argument("headers_only", "false") == "true"
         self.logger.debug("Using path for config request: " + path)
         try:
-            iterator = ConfigObjectTracker.get_objects_in_tree('.', path)
-            for config_obj in iterator:
-                data.append(config_obj)
+            data = await self.executor.get_objects_in_tree(path, True)
+            self.set_header("Etag", _compute_config_etag(
+                data,
+                "headers" if headers_only else "full"
+            ))
+            if self.check_etag_header():
+                self.set_status(304)
+                return self.finish()
+            if not headers_only:
+                data = await self.executor.get_objects_in_tree(path)
             self.set_status(200)
             self.write({"objs": data})
         except Exception:
             self.logger.error("Searching config failed")
             self.logger.error(traceback.format_exc())
+            self.clear_header("Etag")
+            self.write_error(500)
+        return self.finish()
+
+
+class ConfigObject(IPythonHandler):
+    """Provides the definition of a single config object via HTTP."""
+
+    def __init__(self, *args, logger=None, executor=None, **kwargs):
+        """Initialize the HTTP router.
+
+        Takes the same kwargs as :class:`LocalConfig`.
+        """
+        super().__init__(*args, **kwargs)
+        self.logger = logger
+        self.executor: ConfigQueryExecutor = executor
+
+    async def get(self):
+        """Fetch a config object by id, as seen from a working directory.
+
+        Takes an ``id`` argument, and a ``path`` argument with the same meaning
+        as in :class:`LocalConfig`. If no visible object has that id, responds
+        with a 404.
+        """
+        path = self.get_argument("path", ".")
+        obj_id = self.get_argument("id")
+        try:
+            header = await self.executor.get_object(path, obj_id, True)
+            if header is None:
+                self.set_status(404)
+                return self.finish()
+            self.set_header("Etag", _compute_config_etag([header], "object"))
+            if self.check_etag_header():
+                self.set_status(304)
+                return self.finish()
+            obj = await self.executor.get_object(path, obj_id)
+            if obj is None:
+                # deleted or corrupted since the header was indexed
+                self.clear_header("Etag")
+                self.set_status(404)
+                return self.finish()
+            self.set_status(200)
+            self.write(obj)
+        except Exception:
+            self.logger.error("Fetching config object failed")
+            self.logger.error(traceback.format_exc())
+            self.clear_header("Etag")
             self.write_error(500)
         return self.finish()
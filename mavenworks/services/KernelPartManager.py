@@ -1,11 +1,56 @@
 from ..parts import KernelPart, OptionsBag
 from IPython.utils.capture import capture_output
-from IPython.core.ultratb import VerboseTB
 from ipykernel.comm import Comm, CommManager
 from IPython.core.getipython import get_ipython
 from IPython.core.formatters import format_display_data
 from ..serialization import serialize, guess_type, deserialize
+from ..settings import get_setting
+from .comm_compression import CompressedComm, negotiate_encoding
+from .comm_recorder import record_open, recorded
+from .profiling import profiled, _get_pending, _resolve_pending
+from .tracing import span, traced
+from .memory import measure_part, traced_allocations
+from .errors import format_error, format_error_details
+from base64 import b64decode
+import logging
 import sys
+import time
+
+_log = logging.getLogger(__name__)
+
+#: Mimetypes that are sent as raw comm buffers, if the client accepts them.
+BINARY_MIMETYPES = (
+    "image/png",
+    "image/jpeg",
+    "application/vnd.apache.arrow",
+)
+
+
+def _extract_binary_outputs(value):
+    """Move binary outputs out of a display bundle and into comm buffers.
+
+    Jupyter's display formatters base64-encode binary outputs so that they
+    can travel in JSON, which inflates them by a third and costs an encode
+    and decode. Comms can carry raw buffers instead, so this removes them from
+    the bundle and records which buffer holds each mimetype under the
+    ``buffers`` key.
+
+    Returns a tuple of (value, buffers).
+    """
+    data = value["data"]
+    buffers = []
+    buffer_refs = {}
+    for mimetype in BINARY_MIMETYPES:
+        if mimetype not in data:
+            continue
+        raw = data.pop(mimetype)
+        if isinstance(raw, str):
+            raw = b64decode(raw)
+        buffer_refs[mimetype] = len(buffers)
+        buffers.append(raw)
+    if len(buffers) > 0:
+        value["buffers"] = buffer_refs
+    return value, buffers
 
 
 class KernelPartManager:
@@ -24,7 +69,13 @@ class KernelPartManager:
             )
         self.parts = {}
         self.options_bags = {}
-        self.error_formatter = VerboseTB()
+        self.part_types = {}
+        # uuid -> memory accounting, see ``get_stats``
+        self.memory = {}
+        # parts that were disposed to free memory, and will be re-created
+        # on their next render
+        self.evicted = set()
+        self.stale_handlers = {}
         # Connect to a comm
 
     def create_part(self, type_name, uuid):
@@ -32,23 +83,48 @@ class KernelPartManager:
         part.uuid = uuid
         self.parts[uuid] = part
         self.options_bags[uuid] = OptionsBag(part.get_metadata())
+        self.part_types[uuid] = type_name
+        self.memory[uuid] = {
+            "options_bytes": None,
+            "attribute_bytes": None,
+            "traced_bytes": 0,
+            "last_used": time.monotonic(),
+            "over_limit": False,
+        }
 
     def destroy_part(self, uuid):
-        self.parts[uuid].dispose()
-        del self.parts[uuid]
-        del self.options_bags[uuid]
+        if uuid not in self.evicted:
+            self.parts[uuid].dispose()
+            del self.parts[uuid]
+            del self.options_bags[uuid]
+        self.evicted.discard(uuid)
+        del self.part_types[uuid]
+        del self.memory[uuid]
+        self.stale_handlers.pop(uuid, None)
 
     def initialize_part(self, uuid):
-        self.parts[uuid].initialize()
+        with traced_allocations(
+            get_setting("part_memory_tracemalloc")
+        ) as allocated:
+            self.parts[uuid].initialize()
+        self.memory[uuid]["traced_bytes"] += sum(allocated)
 
     def render_part(self, uuid, options):
+        if uuid in self.evicted:
+            self.restore_part(uuid)
         bag: OptionsBag = self.options_bags[uuid]
         bag.is_stale = True
         for opt in options.keys():
             bag[opt] = options[opt]
         bag.set_fresh()
-        with capture_output() as capture:
+        with capture_output() as capture, traced_allocations(
+            get_setting("part_memory_tracemalloc")
+        ) as allocated:
             ret = self.parts[uuid].render(bag)
+        self.memory[uuid]["traced_bytes"] += sum(allocated)
+        self.memory[uuid]["last_used"] = time.monotonic()
+        if get_setting("part_memory_soft_limit"):
+            self._enforce_memory_limit(uuid)
         if ret is not None:
             return ret
         elif len(capture.outputs) > 0:
@@ -56,68 +132,224 @@ class KernelPartManager:
         else:
             return capture.stdout + capture.stderr
 
+    def evict_part(self, uuid):
+        """Dispose a part's instance and options to free their memory.
+
+        The part stays known to the manager, and is re-created and
+        re-initialized the next time it renders. Clients send every option
+        on each render, so they don't notice the difference.
+        """
+        self.parts.pop(uuid).dispose()
+        del self.options_bags[uuid]
+        self.evicted.add(uuid)
+        self.memory[uuid].update(options_bytes=0, attribute_bytes=0)
+
+    def restore_part(self, uuid):
+        """Re-create a part that was evicted."""
+        self.evicted.discard(uuid)
+        self.create_part(self.part_types[uuid], uuid)
+        if uuid in self.stale_handlers:
+            self.options_bags[uuid].OnStale.subscribe(
+                self.stale_handlers[uuid]
+            )
+        self.initialize_part(uuid)
+
+    def measure_memory(self, uuid):
+        """Update the memory estimates of a part, and return its accounting."""
+        memory = self.memory[uuid]
+        if uuid not in self.evicted:
+            memory.update(measure_part(
+                self.parts[uuid],
+                self.options_bags[uuid]
+            ))
+        return memory
+
+    def get_stats(self):
+        """Return the memory accounting of every part.
+
+        Measuring walks every part's options and attributes, so this can take
+        a while in large kernels.
+
+        :returns: A dict of part uuid to a dict with the part's ``type``, the
+            estimated ``options_bytes`` and ``attribute_bytes`` it retains,
+            the net ``traced_bytes`` allocated by its initialize and renders
+            (if the ``part_memory_tracemalloc`` setting is on),
+            ``idle_seconds`` since it last rendered, and whether it was
+            ``evicted`` to free memory.
+        """
+        now = time.monotonic()
+        stats = {}
+        for uuid in list(self.part_types):
+            memory = self.measure_memory(uuid)
+            stats[uuid] = {
+                "type": self.part_types[uuid],
+                "options_bytes": memory["options_bytes"],
+                "attribute_bytes": memory["attribute_bytes"],
+                "traced_bytes": memory["traced_bytes"],
+                "idle_seconds": now - memory["last_used"],
+                "evicted": uuid in self.evicted,
+            }
+        return stats
+
+    def _enforce_memory_limit(self, uuid):
+        """Check a part that just rendered against the soft memory limit.
+
+        Parts over the limit are logged once each time they cross it. If the
+        ``part_memory_limit_action`` setting is "dispose_idle", parts over the
+        limit that haven't rendered in ``part_idle_seconds`` are evicted.
+        """
+        limit = get_setting("part_memory_soft_limit")
+        memory = self.measure_memory(uuid)
+        size = memory["options_bytes"] + memory["attribute_bytes"]
+        if size > limit and not memory["over_limit"]:
+            _log.warning(
+                "Kernel part %s (%s) is using about %d bytes, over the soft "
+                "limit of %d bytes",
+                uuid,
+                self.part_types[uuid],
+                size,
+                limit
+            )
+        memory["over_limit"] = size > limit
+        if get_setting("part_memory_limit_action") != "dispose_idle":
+            return
+        idle_after = time.monotonic() - get_setting("part_idle_seconds")
+        for other, memory in self.memory.items():
+            if (other == uuid or other in self.evicted
+                    or not memory["over_limit"]
+                    or memory["last_used"] > idle_after):
+                continue
+            _log.warning(
+                "Disposing idle kernel part %s (%s) to free memory",
+                other,
+                self.part_types[other]
+            )
+            self.evict_part(other)
+
     def dispatch_msg(self, msg, comm: Comm):
         data = msg['content']['data']
         msg_type = data['msg_type']
         uuid = data['uuid']
         payload = data['payload']
         if msg_type == "create":
-            self.create_part(payload, uuid)
+            with span("run"):
+                self.create_part(payload, uuid)
             bag: OptionsBag = self.options_bags[uuid]
-            bag.OnStale.subscribe(lambda args: comm.send({
-                "msg_type": "stale",
-                "uuid": uuid,
-                "payload": {
-                    "name": args[0],
-                    "value": serialize(args[1], guess_type(args[1]))
-                }
-            }))
+            self.stale_handlers[uuid] = lambda args: self._send_stale(
+                comm,
+                uuid,
+                *args
+            )
+            bag.OnStale.subscribe(self.stale_handlers[uuid])
         if msg_type == "initialize":
             error = None
+            error_id = None
             try:
-                self.initialize_part(uuid)
+                with span("run"):
+                    self.initialize_part(uuid)
             except:  # noqa: E722
-                exc_info = sys.exc_info()
-                error = self.error_formatter.text(*exc_info)
-            comm.send({
-                "msg_type": "initialize_done",
-                "uuid": uuid,
-                "payload": None,
-                "error": error
-            })
+                error, error_id = format_error(*sys.exc_info())
+            with span("send"):
+                comm.send({
+                    "msg_type": "initialize_done",
+                    "uuid": uuid,
+                    "payload": None,
+                    "error": error,
+                    "error_id": error_id
+                })
         if msg_type == "render":
-            options = {
-                name: deserialize(value) for name, value in payload.items()
-            }
+            with span("deserialize"):
+                options = {
+                    name: deserialize(value)
+                    for name, value in payload.items()
+                }
             error = None
+            error_id = None
             value = None
+            buffers = None
+            pending = _get_pending(uuid)
+            should_profile = data.get("profile", False) or len(pending) > 0
+            profile = []
             try:
-                display_data, display_metadata = format_display_data(
-                    self.render_part(uuid, options)
-                )
-                value = {
-                    "data": display_data,
-                    "metadata": display_metadata
-                }
+                with span("run"), profiled(
+                    "render " + uuid,
+                    should_profile
+                ) as profile:
+                    output = self.render_part(uuid, options)
+                with span("format"):
+                    display_data, display_metadata = format_display_data(
+                        output
+                    )
+                    value = {
+                        "data": display_data,
+                        "metadata": display_metadata
+                    }
+                    if data.get("accept_buffers", False):
+                        value, buffers = _extract_binary_outputs(value)
             except:  # noqa: E722
-                exc_info = sys.exc_info()
-                error = self.error_formatter.text(*exc_info)
-            comm.send({
+                error, error_id = format_error(*sys.exc_info())
+            reply = {
                 "msg_type": "render_done",
                 "uuid": uuid,
                 "payload": value,
-                "error": error
+                "error": error,
+                "error_id": error_id
+            }
+            if len(profile) > 0:
+                reply["profile"] = profile[0].to_json()
+                _resolve_pending(pending, profile[0])
+            with span("send"):
+                comm.send(reply, buffers=buffers)
+        if msg_type == "get_error_details":
+            with span("run"):
+                details = format_error_details(payload)
+            comm.send({
+                "msg_type": "error_details",
+                "uuid": uuid,
+                "payload": details
             })
         if msg_type == "dispose":
-            return self.destroy_part(uuid)
+            with span("run"):
+                return self.destroy_part(uuid)
+
+    def _send_stale(self, comm: Comm, uuid, name, value):
+        with span("stale", uuid=uuid):
+            with span("serialize"):
+                serialized = serialize(value, guess_type(value))
+            with span("send"):
+                comm.send({
+                    "msg_type": "stale",
+                    "uuid": uuid,
+                    "payload": {
+                        "name": name,
+                        "value": serialized
+                    }
+                })
 
 
 manager = KernelPartManager.Create()
 ip = get_ipython()
 
 
+def part_stats():
+    """Return the memory accounting of every kernel part.
+
+    See :meth:`KernelPartManager.get_stats`.
+    """
+    return manager.get_stats()
+
+
 def _register_new_client(comm, msg):
-    comm.on_msg(lambda msg: manager.dispatch_msg(msg, comm))
+    record_open("kernel_proxy_part", comm, msg)
+    comm = CompressedComm(comm, negotiate_encoding(msg))
+    comm.on_msg(recorded(
+        "kernel_proxy_part",
+        comm,
+        traced(
+            "kernel_proxy_part",
+            lambda msg: manager.dispatch_msg(msg, comm)
+        )
+    ))
     # TODO: Track what parts were created by a comm and make sure all those
     # parts are destroyed when the channel dies
 
@@ -6,11 +6,23 @@ such as available kernel parts.
 Consumers of this module can update this metadata, so that the client UI can
 leverage the updated metadata (for example, third-party parts will appear in
 the drag-n-drop dashboard editor).
+
+Clients can also ask for the latest output of a named display handle, using
+the ``get_display_handle_output`` message. This lets them render the handle
+without re-running the code that displayed it.
+
+The ``get_part_stats`` message replies with ``part_stats``, holding the
+memory accounting of each kernel part (see ``mavenworks.part_stats``).
 """
 
-from ..parts.DisplayHandle import _get_known_names, _set_name_hook
+from ..parts.DisplayHandle import _get_cached_output, _get_known_names, \
+    _record_display_msg, _set_name_hook
 from ..parts.KernelPart import _get_all_parts, _set_new_part_hook
+from .KernelPartManager import part_stats
 from ..serialization import serialize
+from .comm_compression import CompressedComm, negotiate_encoding
+from .comm_recorder import record_close, record_open, recorded
+from .tracing import traced
 from ipykernel.comm import Comm, CommManager
 from IPython.core.getipython import get_ipython
 from IPython.core.interactiveshell import InteractiveShell
@@ -27,7 +39,8 @@ def _send_part(comm: Comm, name, metadata):
                     "type": opt.type,
                     "value": serialize(opt.value, opt.type)
                 } for opt in metadata.options_bag
-            ]
+            ],
+            "debounce_ms": metadata.debounce_ms
         }
     })
 
@@ -40,6 +53,19 @@ def _send_new_display_handle(comm: Comm, display_name: str, display_id: str):
     })
 
 
+def _send_display_output(comm: Comm, display_name: str):
+    display_id = _get_known_names().get(display_name, None)
+    output = _get_cached_output(display_id) if display_id else None
+    data, metadata = output if output is not None else (None, None)
+    comm.send({
+        "msg_type": "display_handle_output",
+        "handle_id": display_id,
+        "handle_name": display_name,
+        "data": data,
+        "metadata": metadata
+    })
+
+
 def _send_all_parts(comm: Comm):
     for part_name, part_cls in _get_all_parts():
         _send_part(comm, part_name, part_cls.get_metadata())
@@ -55,14 +81,24 @@ def _on_msg(comm: Comm, msg):
     msg_type = data["msg_type"]
     if msg_type == "send_parts":
         _send_all_parts(comm)
+    if msg_type == "get_display_handle_output":
+        _send_display_output(comm, data["handle_name"])
+    if msg_type == "get_part_stats":
+        comm.send({
+            "msg_type": "part_stats",
+            "payload": part_stats()
+        })
 
 
-def _close_comm():
+def _close_comm(comm: Comm):
+    record_close("maven_metadata", comm)
     _set_new_part_hook(None)
     _set_name_hook(None)
 
 
 def _open_comm(comm: Comm, msg):
+    record_open("maven_metadata", comm, msg)
+    comm = CompressedComm(comm, negotiate_encoding(msg))
     _set_name_hook(
         lambda display_name, display_id: _send_new_display_handle(
             comm,
@@ -77,8 +113,12 @@ def _open_comm(comm: Comm, msg):
             part_cls.get_metadata()
         )
     )
-    comm.on_msg(lambda msg: _on_msg(comm, msg))
-    comm.on_close(_close_comm)
+    comm.on_msg(recorded(
+        "maven_metadata",
+        comm,
+        traced("maven_metadata", lambda msg: _on_msg(comm, msg))
+    ))
+    comm.on_close(lambda msg: _close_comm(comm))
 
 
 ip: InteractiveShell = get_ipython()
@@ -86,3 +126,5 @@ ip: InteractiveShell = get_ipython()
 if ip is not None:
     manager: CommManager = ip.kernel.comm_manager
     manager.register_target("maven_metadata", _open_comm)
+    if hasattr(ip.display_pub, "register_hook"):
+        ip.display_pub.register_hook(_record_display_msg)
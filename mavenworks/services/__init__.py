@@ -3,6 +3,9 @@
 from .expression_evaluator import *  # noqa F401 F403
 from .KernelPartManager import *  # noqa F401 F403
 from .MetadataComm import *  # noqa F401 F403
+from .comm_recorder import start_recording, stop_recording  # noqa F401
+from .profiling import profile_part  # noqa F401
+from .tracing import clear_trace, dump_trace  # noqa F401
 from IPython.core.display import display
 
 display({
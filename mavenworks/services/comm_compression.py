@@ -0,0 +1,149 @@
+"""Comm Compression - MavenWorks internal module.
+
+Large comm messages (JSON tables, HTML, SVG) are slow to send over high
+latency links to the Jupyter server. Clients that can decompress messages
+list the encodings they accept when they open a comm::
+
+    {"accept_encodings": ["zstd", "gzip"]}
+
+Messages to those clients that are larger than the
+``comm_compression_min_bytes`` setting are then sent as an envelope instead::
+
+    {"encoding": "zstd"}
+
+where the compressed JSON of the original message is the last buffer of the
+comm message. Any buffers sent with the original message keep their indices.
+
+zstd and lz4 require the ``zstandard`` and ``lz4`` packages, and are skipped
+if those aren't installed. gzip is always available.
+"""
+
+import zlib
+from ipykernel.jsonutil import json_clean
+from jupyter_client.session import json_packer
+from ..settings import get_setting
+
+
+def _compress_zstd(data):
+    import zstandard
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _compress_lz4(data):
+    import lz4.frame
+    return lz4.frame.compress(data)
+
+
+def _compress_gzip(data):
+    # wbits=31 selects the gzip container
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+#: Supported encodings, mapped to the module they require and a compressor
+_codecs = {
+    "zstd": ("zstandard", _compress_zstd),
+    "lz4": ("lz4.frame", _compress_lz4),
+    "gzip": (None, _compress_gzip),
+}
+_available = {}
+
+
+def _is_available(encoding):
+    if encoding not in _available:
+        module, _ = _codecs[encoding]
+        if module is None:
+            _available[encoding] = True
+        else:
+            try:
+                __import__(module)
+                _available[encoding] = True
+            except ImportError:
+                _available[encoding] = False
+    return _available[encoding]
+
+
+def _is_large(data, min_bytes):
+    """Return whether a message is likely to be at least ``min_bytes`` long.
+
+    This only walks as much of the message as it takes to decide, so small
+    messages are skipped without serializing them. Strings are counted by
+    length, and everything else as a few bytes.
+    """
+    size = 0
+    stack = [data]
+    while len(stack) > 0:
+        value = stack.pop()
+        if isinstance(value, (str, bytes)):
+            size += len(value)
+        elif isinstance(value, dict):
+            size += len(value)
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            size += len(value)
+            stack.extend(value)
+        else:
+            size += 4
+        if size >= min_bytes:
+            return True
+    return False
+
+
+def negotiate_encoding(open_msg):
+    """Pick the encoding to compress messages to a client with.
+
+    The kernel's preference (the ``comm_compression`` setting) wins over the
+    client's order.
+
+    :param open_msg: The comm_open message sent by the client
+    :returns: The name of an encoding, or None if compression is disabled or
+        no encoding is supported by both sides.
+    """
+    data = open_msg["content"].get("data", None) or {}
+    accepted = data.get("accept_encodings", None) or []
+    for encoding in get_setting("comm_compression") or []:
+        if (encoding in _codecs and encoding in accepted
+                and _is_available(encoding)):
+            return encoding
+    return None
+
+
+class CompressedComm:
+    """Wrap a Comm to compress large messages sent through it.
+
+    Only ``send`` is changed, every other attribute is forwarded to the
+    wrapped Comm.
+    """
+
+    def __init__(self, comm, encoding):
+        """Wrap a comm.
+
+        :param comm: The Comm to send messages through
+        :param encoding: The encoding to compress large messages with, or
+            None to send every message as-is
+        """
+        self.comm = comm
+        self.encoding = encoding
+
+    def send(self, data=None, metadata=None, buffers=None):
+        """Send a message, compressing it if it's large enough."""
+        min_bytes = get_setting("comm_compression_min_bytes")
+        if (self.encoding is not None and data is not None
+                and _is_large(data, min_bytes)):
+            # the same packer the session uses, so that values like NaN are
+            # sent the same way either way
+            raw = json_packer(json_clean(data))
+            if len(raw) >= min_bytes:
+                _, compress = _codecs[self.encoding]
+                compressed = compress(raw)
+                # don't bother if it didn't help, eg. for random data
+                if len(compressed) < len(raw):
+                    # the envelope is tiny, so the session only has to
+                    # serialize the original message once, here
+                    data = {"encoding": self.encoding}
+                    buffers = list(buffers or []) + [compressed]
+        return self.comm.send(data, metadata=metadata, buffers=buffers)
+
+    def __getattr__(self, name):
+        return getattr(self.comm, name)
@@ -0,0 +1,206 @@
+"""Comm Recorder - MavenWorks internal module.
+
+Records the messages that clients send to the kernel services, so that an
+interactive workload can be replayed later without a browser (see
+``benchmarks/replay_comms.py``).
+
+Recording is off by default. It can be turned on for every kernel with the
+``comm_record_dir`` setting, or for the current kernel with::
+
+    import mavenworks
+    mavenworks.start_recording("session.jsonl.gz", include_sources=True)
+
+Recordings are gzipped JSON lines. The first line is a header, and every
+following line is one event::
+
+    {"t": 1.25, "target": "kernel_proxy_part", "comm_id": "...",
+     "event": "msg", "data": {...}, "duration": 0.004}
+
+``t`` is seconds since recording started, and ``duration`` is how long the
+kernel took to handle the message. ``event`` is one of ``open``, ``msg``, or
+``close``. If sources are included, the source code of each kernel part is
+recorded as a ``part_source`` event before the first message that creates it.
+
+.. note::
+    Recordings contain everything clients send to the kernel, including the
+    values of dashboard globals. Treat them as sensitive.
+"""
+
+import atexit
+import gzip
+import inspect
+import json
+import linecache
+import os
+import threading
+import time
+from base64 import b64encode
+from ..parts.KernelPart import registry
+from ..settings import get_setting
+
+__all__ = [
+    "start_recording",
+    "stop_recording",
+]
+
+FORMAT_VERSION = 1
+
+_recorder = None
+_lock = threading.Lock()
+
+
+def _get_part_source(cls):
+    """Return the source code of a part class, or None if it can't be found.
+
+    Classes defined in notebook cells don't belong to a file that ``inspect``
+    can search, so for those this returns the whole cell that defined one of
+    the class's methods instead.
+    """
+    try:
+        return inspect.getsource(cls)
+    except (OSError, TypeError):
+        pass
+    for attr in vars(cls).values():
+        code = getattr(getattr(attr, "__func__", attr), "__code__", None)
+        if code is None:
+            continue
+        lines = linecache.getlines(code.co_filename)
+        if len(lines) > 0:
+            return "".join(lines)
+    return None
+
+
+class _Recorder:
+    def __init__(self, path, include_sources):
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.include_sources = include_sources
+        self.recorded_sources = set()
+        self.start = time.perf_counter()
+        self.write({
+            "version": FORMAT_VERSION,
+            "started": time.time(),
+            "include_sources": include_sources
+        })
+
+    def write(self, event):
+        self.file.write(json.dumps(event, separators=(",", ":"), default=str))
+        self.file.write("\n")
+
+    def record(self, event, target, comm_id, msg=None, t=None, duration=None):
+        record = {
+            "t": (time.perf_counter() if t is None else t) - self.start,
+            "target": target,
+            "comm_id": comm_id,
+            "event": event,
+        }
+        if msg is not None:
+            record["data"] = msg["content"].get("data", None)
+            if msg.get("buffers"):
+                record["buffers"] = [
+                    b64encode(buf).decode("ascii") for buf in msg["buffers"]
+                ]
+        if duration is not None:
+            record["duration"] = duration
+        self.write(record)
+
+    def record_part_source(self, name):
+        if name in self.recorded_sources or name not in registry:
+            return
+        self.recorded_sources.add(name)
+        self.write({
+            "t": time.perf_counter() - self.start,
+            "event": "part_source",
+            "name": name,
+            "source": _get_part_source(registry[name])
+        })
+
+    def close(self):
+        self.file.close()
+
+
+def start_recording(path, include_sources=False):
+    """Record messages sent to the kernel services, until stopped.
+
+    Any recording that is already running is stopped first.
+
+    :param path: The file to write the recording to
+    :param include_sources: Whether to record the source code of kernel parts
+        as they are created, so that replays can define them
+    """
+    global _recorder
+    with _lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = _Recorder(path, include_sources)
+
+
+def stop_recording():
+    """Stop recording, and close the recording file."""
+    global _recorder
+    with _lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = None
+
+
+def record_open(target, comm, msg):
+    """Record that a client opened a comm."""
+    with _lock:
+        if _recorder is not None:
+            _recorder.record("open", target, comm.comm_id, msg)
+
+
+def record_close(target, comm):
+    """Record that a comm was closed."""
+    with _lock:
+        if _recorder is not None:
+            _recorder.record("close", target, comm.comm_id)
+
+
+def recorded(target, comm, handler):
+    """Wrap a comm message handler to record the messages it handles.
+
+    :param target: The comm target name, used to route messages on replay
+    :param comm: The comm the handler belongs to
+    :param handler: A callable taking the message
+    """
+    def on_msg(msg):
+        recorder = _recorder
+        if recorder is None:
+            return handler(msg)
+        data = msg["content"].get("data", None) or {}
+        if (recorder.include_sources and target == "kernel_proxy_part"
+                and data.get("msg_type", None) == "create"):
+            with _lock:
+                if _recorder is recorder:
+                    recorder.record_part_source(data["payload"])
+        start = time.perf_counter()
+        try:
+            return handler(msg)
+        finally:
+            duration = time.perf_counter() - start
+            with _lock:
+                # skip if the recording was stopped while handling this
+                if _recorder is recorder:
+                    recorder.record(
+                        "msg",
+                        target,
+                        comm.comm_id,
+                        msg,
+                        t=start,
+                        duration=duration
+                    )
+    return on_msg
+
+
+atexit.register(stop_recording)
+
+_record_dir = get_setting("comm_record_dir")
+if _record_dir:
+    start_recording(
+        os.path.join(_record_dir, "comms-%d-%d.jsonl.gz" % (
+            os.getpid(),
+            time.time()
+        )),
+        include_sources=bool(get_setting("comm_record_sources"))
+    )
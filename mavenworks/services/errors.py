@@ -0,0 +1,200 @@
+"""Error formatting - MavenWorks internal module.
+
+Formats the exceptions raised by kernel parts and expressions for clients.
+
+IPython's ``VerboseTB`` reads the source of every frame and inspects its
+locals, which is slow when many bindings fail at once, and can send huge
+reprs to the client. By default, errors are instead sent as a compact
+traceback. The exception is kept for a while under an error id, and clients
+can ask for its details (with the locals of each frame, with capped reprs)
+using that id.
+
+The ``error_traceback_style`` setting picks the default format: "compact"
+(colored), "plain", or "verbose" to always use ``VerboseTB``.
+"""
+
+import reprlib
+import traceback
+from collections import OrderedDict
+from uuid import uuid4
+from ..settings import get_setting
+
+# error id -> (type, value, traceback), oldest first
+_errors = OrderedDict()
+_verbose_tb = None
+
+_RED = "\x1b[31m"
+_GREEN = "\x1b[32m"
+_CYAN = "\x1b[36m"
+_RESET = "\x1b[0m"
+
+_repr = reprlib.Repr()
+_repr.maxstring = 200
+_repr.maxother = 200
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = 10
+
+#: Longest exception message shown, in characters
+MAX_MESSAGE_LENGTH = 2000
+#: Most frames shown in a traceback. Frames in the middle are omitted.
+MAX_FRAMES = 50
+#: Most locals shown for each frame in detailed tracebacks
+MAX_LOCALS = 25
+
+
+def _cap(text, length):
+    if len(text) <= length:
+        return text
+    return text[:length] + "... (%d characters omitted)" % (
+        len(text) - length
+    )
+
+
+def _safe_repr(value):
+    try:
+        return _repr.repr(value)
+    except Exception as e:
+        return "<repr failed: %s>" % type(e).__name__
+
+
+def _format_exception_only(etype, value, color):
+    lines = traceback.format_exception_only(etype, value)
+    text = _cap("".join(lines).rstrip("\n"), MAX_MESSAGE_LENGTH)
+    if color:
+        name, sep, rest = text.rpartition(etype.__name__)
+        text = name + _RED + etype.__name__ + _RESET + rest if sep else text
+    return text
+
+
+def _chained(value, fmt, seen):
+    """Format the exceptions that a traceback was caused by, like Python."""
+    seen.add(id(value))
+    cause = value.__cause__
+    if cause is not None and id(cause) not in seen:
+        return [
+            fmt(type(cause), cause, cause.__traceback__, seen),
+            "\nThe above exception was the direct cause of the following "
+            "exception:\n"
+        ]
+    context = value.__context__
+    if (context is not None and not value.__suppress_context__
+            and id(context) not in seen):
+        return [
+            fmt(type(context), context, context.__traceback__, seen),
+            "\nDuring handling of the above exception, another exception "
+            "occurred:\n"
+        ]
+    return []
+
+
+def _omit_frames(frames):
+    if len(frames) <= MAX_FRAMES:
+        return frames, 0
+    head = MAX_FRAMES // 5
+    tail = MAX_FRAMES - head
+    return frames[:head] + frames[-tail:], len(frames) - MAX_FRAMES
+
+
+def _format_compact(etype, value, tb, color, seen=None):
+    if seen is None:
+        seen = set()
+    parts = _chained(
+        value,
+        lambda etype, value, tb, seen: _format_compact(
+            etype, value, tb, color, seen
+        ),
+        seen
+    )
+    parts.append("Traceback (most recent call last):")
+    frames, omitted = _omit_frames(traceback.extract_tb(tb))
+    for i, frame in enumerate(frames):
+        if omitted and i == MAX_FRAMES // 5:
+            parts.append("  ... %d frames omitted ..." % omitted)
+        if color:
+            parts.append('  File %s"%s"%s, line %s%d%s, in %s%s%s' % (
+                _GREEN, frame.filename, _RESET,
+                _GREEN, frame.lineno, _RESET,
+                _CYAN, frame.name, _RESET
+            ))
+        else:
+            parts.append('  File "%s", line %d, in %s' % (
+                frame.filename, frame.lineno, frame.name
+            ))
+        if frame.line:
+            parts.append("    " + frame.line)
+    parts.append(_format_exception_only(etype, value, color))
+    return "\n".join(parts)
+
+
+def _remember(exc_info):
+    """Keep an exception for ``format_error_details``, and return its id."""
+    error_id = str(uuid4())
+    _errors[error_id] = exc_info
+    # tracebacks keep every frame's locals alive, so only a few are kept
+    while len(_errors) > get_setting("error_details_cache_size"):
+        _errors.popitem(last=False)
+    return error_id
+
+
+def format_error(etype, value, tb):
+    """Format an exception for a client.
+
+    :returns: A tuple of the formatted traceback, and the error id that
+        clients can pass to :func:`format_error_details`.
+    """
+    style = get_setting("error_traceback_style")
+    error_id = _remember((etype, value, tb))
+    if style == "verbose":
+        return format_error_details(error_id), error_id
+    return _format_compact(etype, value, tb, style != "plain"), error_id
+
+
+def format_error_details(error_id):
+    """Format a remembered exception with the locals of every frame.
+
+    :param error_id: The id returned by :func:`format_error`
+    :returns: The detailed traceback, or None if the error is no longer
+        remembered.
+    """
+    exc_info = _errors.get(error_id, None)
+    if exc_info is None:
+        return None
+    if get_setting("error_traceback_style") == "verbose":
+        global _verbose_tb
+        if _verbose_tb is None:
+            from IPython.core.ultratb import VerboseTB
+            _verbose_tb = VerboseTB()
+        return _verbose_tb.text(*exc_info)
+    return _format_details(*exc_info)
+
+
+def _format_details(etype, value, tb, seen=None):
+    if seen is None:
+        seen = set()
+    parts = _chained(value, _format_details, seen)
+    parts.append("Traceback (most recent call last):")
+    frames, omitted = _omit_frames(list(traceback.walk_tb(tb)))
+    for i, (frame, lineno) in enumerate(frames):
+        if omitted and i == MAX_FRAMES // 5:
+            parts.append("  ... %d frames omitted ..." % omitted)
+        code = frame.f_code
+        parts.append('  File %s"%s"%s, line %s%d%s, in %s%s%s' % (
+            _GREEN, code.co_filename, _RESET,
+            _GREEN, lineno, _RESET,
+            _CYAN, code.co_name, _RESET
+        ))
+        line = traceback.FrameSummary(
+            code.co_filename,
+            lineno,
+            code.co_name
+        ).line
+        if line:
+            parts.append("    " + line)
+        local_vars = list(frame.f_locals.items())
+        for name, local in local_vars[:MAX_LOCALS]:
+            parts.append("        %s = %s" % (name, _safe_repr(local)))
+        if len(local_vars) > MAX_LOCALS:
+            parts.append("        ... %d more locals" % (
+                len(local_vars) - MAX_LOCALS
+            ))
+    parts.append(_format_exception_only(etype, value, True))
+    return "\n".join(parts)
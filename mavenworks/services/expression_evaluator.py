@@ -18,7 +18,11 @@ The comm accepts the following messages:
 
  - ``evaluate_expr``: Given an expression and the values of a set of globals,
    evaluate the expression and return the result. If the expression failed to
-   complete, trap the error and return it to the front-end
+   complete, trap the error and return it to the front-end. If the message
+   has a truthy ``profile`` key, the expression is run under cProfile and the
+   reply includes a ``profile`` summary.
+ - ``get_error_details``: Given the ``error_id`` of an ``expr_error``, return
+   a detailed traceback of that error, including the locals of each frame.
 
 The comm sends the following messages:
 
@@ -27,7 +31,10 @@ The comm sends the following messages:
    will instead send ``expr_error``.
  - ``expr_error``: If a expression evaluation failed, this will be sent instead
    of ``expr_value`` and will include a serialized form of error that clients
-   must present to the user.
+   must present to the user. Its ``error_id`` can be passed to
+   ``get_error_details``.
+ - ``error_details``: The reply to ``get_error_details``. The payload is null
+   if the error is too old to have details.
 """
 
 
@@ -35,14 +42,18 @@ import re
 import sys
 from typing import AnyStr, Dict, Any
 from IPython import get_ipython
-from IPython.core.ultratb import VerboseTB
 from ipykernel.comm import Comm
 from ..serialization import serialize, deserialize, guess_type
+from .comm_compression import CompressedComm, negotiate_encoding
+from .comm_recorder import record_open, recorded
+from .profiling import profiled
+from .tracing import span, traced
+from .errors import format_error, format_error_details
 
 MESSAGE_TYPES = [
-    "evaluate_expr"
+    "evaluate_expr",
+    "get_error_details",
 ]
-tb_formatter = VerboseTB()
 global_regex = re.compile(r"\@([A-Za-z][A-Za-z0-9_]*)")
 
 
@@ -50,28 +61,39 @@ def evaluate_expr(
         expr: AnyStr,
         globals_dict: Dict[AnyStr, Any],
         comm: Comm,
-        parent: AnyStr):
+        parent: AnyStr,
+        profile: bool = False):
     ip = get_ipython()
     locals_dict = {}
     locals_dict.update(ip.user_ns)
     locals_dict.update(globals_dict)
     expr = global_regex.sub(r"\1", expr)
+    profile_result = []
     try:
-        value = eval(expr, ip.user_global_ns, locals_dict)
+        with span("run"), profiled(
+            "expr " + parent,
+            profile
+        ) as profile_result:
+            value = eval(expr, ip.user_global_ns, locals_dict)
     except:  # noqa: E722
-        exc_info = sys.exc_info()
-        exc = tb_formatter.text(*exc_info)
-        comm.send({
+        exc, error_id = format_error(*sys.exc_info())
+        msg = {
             "msg_type": "expr_error",
             "payload": serialize(exc, "String"),
-            "parent": parent
-        })
-        return
-    comm.send({
-        "msg_type": "expr_value",
-        "payload": serialize(value, guess_type(value)),
-        "parent": parent
-    })
+            "parent": parent,
+            "error_id": error_id
+        }
+    else:
+        with span("serialize"):
+            msg = {
+                "msg_type": "expr_value",
+                "payload": serialize(value, guess_type(value)),
+                "parent": parent
+            }
+    if len(profile_result) > 0:
+        msg["profile"] = profile_result[0].to_json()
+    with span("send"):
+        comm.send(msg)
 
 
 def dispatch_message(comm, msg):
@@ -79,14 +101,37 @@ def dispatch_message(comm, msg):
     msg_type = content["msg_type"]
     if msg_type not in MESSAGE_TYPES:
         raise KeyError("Unrecognized message type " + msg_type)
-    globals_dict = {
-        g: deserialize(v) for g, v in content["globals"].items()
-    }
-    evaluate_expr(content.get("expr", ""), globals_dict, comm, content["uuid"])
+    if msg_type == "get_error_details":
+        comm.send({
+            "msg_type": "error_details",
+            "payload": format_error_details(content["error_id"]),
+            "parent": content["uuid"]
+        })
+        return
+    with span("deserialize"):
+        globals_dict = {
+            g: deserialize(v) for g, v in content["globals"].items()
+        }
+    evaluate_expr(
+        content.get("expr", ""),
+        globals_dict,
+        comm,
+        content["uuid"],
+        content.get("profile", False)
+    )
 
 
-def register_frontend(comm, _msg):
-    comm.on_msg(lambda msg: dispatch_message(comm, msg))
+def register_frontend(comm, msg):
+    record_open("expression_evaluator", comm, msg)
+    comm = CompressedComm(comm, negotiate_encoding(msg))
+    comm.on_msg(recorded(
+        "expression_evaluator",
+        comm,
+        traced(
+            "expression_evaluator",
+            lambda msg: dispatch_message(comm, msg)
+        )
+    ))
 
 
 ip = get_ipython()
@@ -0,0 +1,119 @@
+"""Memory accounting - MavenWorks internal module.
+
+Estimates how much memory each kernel part holds onto, so that large kernels
+can be traced back to the parts responsible.
+
+Sizes are estimates. Objects are walked to a limited depth and breadth, and
+shared objects are only counted once per part (so a table held by two parts
+counts towards both). DataFrames and Series are sized with
+``memory_usage(deep=True)``, and numpy arrays by their buffer.
+"""
+
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+#: Objects past this depth of containers and attributes aren't counted
+MAX_DEPTH = 8
+#: Stop walking a value after this many objects
+MAX_OBJECTS = 100000
+
+_shared_types = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+)
+
+
+def deep_sizeof(obj, seen=None):
+    """Estimate the memory retained by an object, in bytes.
+
+    :param obj: The object to size
+    :param seen: A set of ids already counted, to share between calls
+    """
+    if seen is None:
+        seen = set()
+    pd = sys.modules.get("pandas", None)
+    np = sys.modules.get("numpy", None)
+    size = 0
+    stack = [(obj, 0)]
+    while len(stack) > 0 and len(seen) < MAX_OBJECTS:
+        value, depth = stack.pop()
+        if id(value) in seen or isinstance(value, _shared_types):
+            continue
+        seen.add(id(value))
+        if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+            usage = value.memory_usage(index=True, deep=True)
+            size += int(usage.sum() if hasattr(usage, "sum") else usage)
+            continue
+        if np is not None and isinstance(value, np.ndarray):
+            if value.base is None:
+                size += value.nbytes
+            else:
+                # views don't own their buffer
+                size += sys.getsizeof(value)
+            continue
+        try:
+            size += sys.getsizeof(value)
+        except TypeError:
+            continue
+        if depth >= MAX_DEPTH or isinstance(value, (str, bytes, bytearray)):
+            continue
+        if isinstance(value, dict):
+            for key, item in value.items():
+                stack.append((key, depth + 1))
+                stack.append((item, depth + 1))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend((item, depth + 1) for item in value)
+        if hasattr(value, "__dict__"):
+            stack.append((vars(value), depth + 1))
+        for slot in getattr(type(value), "__slots__", ()):
+            if hasattr(value, slot):
+                stack.append((getattr(value, slot), depth + 1))
+    return size
+
+
+def measure_part(part, bag):
+    """Estimate the memory retained by a part and its options.
+
+    Options are counted first, so that attributes which hold on to an option
+    don't count it twice.
+
+    :returns: A dict with ``options_bytes`` and ``attribute_bytes``
+    """
+    seen = set()
+    options_bytes = sum(
+        deep_sizeof(bag[name], seen) for name in bag
+    ) if bag is not None else 0
+    attribute_bytes = deep_sizeof(vars(part), seen)
+    return {
+        "options_bytes": options_bytes,
+        "attribute_bytes": attribute_bytes,
+    }
+
+
+@contextmanager
+def traced_allocations(enabled=True):
+    """Measure the net memory allocated by a block, using tracemalloc.
+
+    Yields a list that holds the net bytes allocated once the block exits. If
+    ``enabled`` is False, the list stays empty.
+
+    tracemalloc is started the first time this is used, and slows down every
+    allocation in the kernel from then on.
+    """
+    result = []
+    if not enabled:
+        yield result
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    try:
+        yield result
+    finally:
+        after, _ = tracemalloc.get_traced_memory()
+        result.append(after - before)
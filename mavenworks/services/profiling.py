@@ -0,0 +1,127 @@
+"""Profiling - MavenWorks internal module.
+
+Runs individual part renders and expression evaluations under cProfile, so
+that a slow part can be diagnosed without profiling the whole kernel.
+
+Profiling is requested either by the client, with a ``profile`` flag on the
+``render`` or ``evaluate_expr`` message, or from Python with
+:func:`profile_part`. The reply then includes a ``profile`` object with a
+pstats summary, and the path of the saved profile if the
+``profile_output_dir`` setting is set. Saved profiles can be opened with
+``pstats``, snakeviz, or any other tool that reads cProfile output.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from ..settings import get_setting
+
+__all__ = [
+    "profile_part",
+]
+
+_pending = {}  # part uuid -> Futures waiting for its next render
+
+
+class Profile:
+    """The result of a profiled render or expression."""
+
+    def __init__(self, name, profile):
+        self.name = name
+        self.stats = pstats.Stats(profile)
+        self.path = None
+        output_dir = get_setting("profile_output_dir")
+        if output_dir:
+            filename = "%s-%d.prof" % (
+                re.sub(r"[^\w.-]", "_", name),
+                time.time() * 1000
+            )
+            self.path = os.path.join(output_dir, filename)
+            self.stats.dump_stats(self.path)
+
+    def summary(self):
+        """Return the slowest calls as text, by cumulative time."""
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats("cumulative").print_stats(
+            get_setting("profile_summary_lines")
+        )
+        return stream.getvalue()
+
+    def to_json(self):
+        """Return this profile in the form sent to clients."""
+        return {
+            "summary": self.summary(),
+            "path": self.path,
+            "total_time": self.stats.total_tt
+        }
+
+
+@contextmanager
+def profiled(name, enabled=True):
+    """Run a block under cProfile.
+
+    Yields a list that holds the :class:`Profile` once the block exits, even
+    if it raised. If ``enabled`` is False, the block runs normally and the
+    list stays empty.
+
+    :param name: What's being profiled, used to name saved profiles
+    :param enabled: Whether to profile the block
+    """
+    result = []
+    if not enabled:
+        yield result
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        result.append(Profile(name, profile))
+
+
+def profile_part(uuid):
+    """Profile the next render of a kernel part.
+
+    The render runs as usual when the dashboard next asks for it, so this
+    works for parts that are already running.
+
+    :param uuid: The id of the part, as shown in the dashboard's part
+        properties
+    :returns: A Future that resolves to a :class:`pstats.Stats` once the part
+        has rendered. Renders happen between cell executions, so don't wait on
+        it in the same cell that called this.
+
+    :Example:
+
+    >>> future = mavenworks.profile_part("...")
+    >>> # (change a part option to re-render it, then, in another cell:)
+    >>> future.result().sort_stats("cumulative").print_stats(20)
+    """
+    future = Future()
+    _pending.setdefault(uuid, []).append(future)
+    return future
+
+
+def _get_pending(uuid):
+    """Return the :func:`profile_part` requests for a part.
+
+    The KernelPartManager knows parts by their dashboard id and part id, but
+    users only know the latter.
+    """
+    return [
+        key for key in _pending
+        if key == uuid or uuid.endswith(" " + key)
+    ]
+
+
+def _resolve_pending(keys, profile):
+    for key in keys:
+        for future in _pending.pop(key, []):
+            future.set_result(profile.stats)
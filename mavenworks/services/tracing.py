@@ -0,0 +1,141 @@
+"""Tracing - MavenWorks internal module.
+
+The kernel services record what they do with each comm message as trace
+spans: how long the message waited to be handled, and how long it took to
+deserialize, run, format, serialize, and send. Spans carry the part uuid and
+the id of the message that caused them, and are kept in a ring buffer of the
+last ``trace_buffer_size`` spans.
+
+Tracing is off by default, since the buffer holds on to memory in every
+kernel. Set ``trace_buffer_size`` (to 10000, say) before starting the kernel
+to turn it on.
+
+:func:`dump_trace` writes the buffer in the Chrome Trace Event format, which
+can be opened in Perfetto (https://ui.perfetto.dev) or ``chrome://tracing``
+to see a dashboard load as a timeline.
+
+.. note::
+    The ``queued`` span starts when the client sent the message, according
+    to the client's clock. If the client and kernel clocks differ, it will be
+    off by that much, or missing.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from ..settings import get_setting
+
+__all__ = [
+    "dump_trace",
+    "clear_trace",
+]
+
+_buffer_size = get_setting("trace_buffer_size")
+_events = deque(maxlen=_buffer_size) if _buffer_size else None
+_pid = os.getpid()
+# converts perf_counter() to seconds since the epoch
+_clock_offset = time.time() - time.perf_counter()
+_local = threading.local()
+
+
+def _now_us():
+    return (time.perf_counter() + _clock_offset) * 1e6
+
+
+def _add_span(name, category, start, end, args):
+    _events.append({
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start,
+        "dur": end - start,
+        "pid": _pid,
+        "tid": threading.get_ident(),
+        "args": args
+    })
+
+
+@contextmanager
+def span(name, **args):
+    """Record a block as a trace span.
+
+    Spans inherit the category and args of the span they're nested in.
+
+    :param name: The name of the span, like "deserialize"
+    :param args: Extra args to show with the span
+    """
+    if _events is None:
+        yield
+        return
+    parent = getattr(_local, "current", None) or ("mavenworks", {})
+    category, parent_args = parent
+    span_args = dict(parent_args)
+    span_args.update(args)
+    _local.current = (category, span_args)
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _add_span(name, category, start, _now_us(), span_args)
+        _local.current = parent
+
+
+def traced(target, handler):
+    """Wrap a comm message handler to trace the messages it handles.
+
+    :param target: The comm target name, used as the category of the spans
+    :param handler: A callable taking the message
+    """
+    def on_msg(msg):
+        if _events is None:
+            return handler(msg)
+        received = _now_us()
+        data = msg["content"].get("data", None) or {}
+        header = msg.get("header", None) or {}
+        args = {"msg_id": header.get("msg_id", None)}
+        if "uuid" in data:
+            args["uuid"] = data["uuid"]
+        sent = header.get("date", None)
+        if isinstance(sent, str):
+            try:
+                sent = datetime.fromisoformat(sent.replace("Z", "+00:00"))
+            except ValueError:
+                sent = None
+        if isinstance(sent, datetime):
+            sent = sent.timestamp() * 1e6
+            if sent < received:
+                _add_span("queued", target, sent, received, args)
+        parent = getattr(_local, "current", None)
+        _local.current = (target, {})
+        try:
+            with span(str(data.get("msg_type", "message")), **args):
+                return handler(msg)
+        finally:
+            _local.current = parent
+    return on_msg
+
+
+def dump_trace(path=None):
+    """Return the recorded spans as a Chrome Trace Event object.
+
+    :param path: If given, also write the trace to this file as JSON
+    :returns: A dict with a ``traceEvents`` list, as Perfetto expects
+    """
+    trace = {
+        "traceEvents": list(_events) if _events is not None else [],
+        "displayTimeUnit": "ms"
+    }
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(trace, f, default=str)
+    return trace
+
+
+def clear_trace():
+    """Discard all recorded spans."""
+    if _events is not None:
+        _events.clear()
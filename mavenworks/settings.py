@@ -8,7 +8,68 @@ __all__ = [
 ]
 
 _default_settings = {
-    "global_parts_folder": "parts"
+    "global_parts_folder": "parts",
+    # Seconds between polls of the config index. Set to 0 to disable the
+    # watcher and validate the index on every request instead.
+    "config_poll_interval": 5,
+    # Maximum number of config scans to run at once, across all requests
+    "config_max_concurrent_scans": 4,
+    # Whether to persist the config index in the Jupyter runtime dir, so that
+    # restarted servers don't need to re-read every config object
+    "config_index_cache": True,
+    # Number of threads used to read config objects when (re)building the
+    # config index. Raise this for parts folders on network drives.
+    "config_read_threads": 8,
+    # Maximum size (in bytes) of the kernel-side cache of named display
+    # handle outputs, used to re-sync them when clients reconnect
+    "display_handle_cache_bytes": 32 * 1024 * 1024,
+    # Tables larger than this (in bytes) passed as options to Python dashboard
+    # parts are kept in the kernel and fetched by the client on demand,
+    # instead of being inlined in the dashboard's output
+    "dashboard_inline_max_bytes": 64 * 1024,
+    # Number of those tables kept in the kernel. The least recently used are
+    # discarded first, and dashboards that use them need to be re-run.
+    "dashboard_hoisted_cache_size": 64,
+    # Arrow IPC format used to send tables to clients, "file" or "stream"
+    "arrow_ipc_format": "file",
+    # Compression for Arrow buffers: null, "lz4", or "zstd". Requires
+    # pyarrow >= 2.0, and a client whose Arrow reader supports compression.
+    "arrow_compression": None,
+    # Encodings to compress large comm messages with, in order of preference.
+    # Only used with clients that accept them, null disables compression.
+    "comm_compression": ["zstd", "lz4", "gzip"],
+    # Comm messages smaller than this (as JSON) are never compressed
+    "comm_compression_min_bytes": 32 * 1024,
+    # If set, kernels record the messages sent to their comms to a file in
+    # this directory, for replaying with benchmarks/replay_comms.py
+    "comm_record_dir": None,
+    # Whether recordings include the source code of the kernel parts used
+    "comm_record_sources": False,
+    # If set, profiled renders and expressions are saved to this directory
+    "profile_output_dir": None,
+    # Number of functions listed in the profile summaries sent to clients
+    "profile_summary_lines": 30,
+    # Number of trace spans kept by the kernel services, for
+    # mavenworks.dump_trace(). Each span takes roughly 600 bytes. 0 disables
+    # tracing.
+    "trace_buffer_size": 0,
+    # Kernel parts estimated to retain more than this many bytes are logged,
+    # and handled according to part_memory_limit_action. null disables.
+    "part_memory_soft_limit": None,
+    # "warn" to only log parts over the limit, or "dispose_idle" to also
+    # dispose parts over the limit that haven't rendered recently. Disposed
+    # parts are re-created when they next render.
+    "part_memory_limit_action": "warn",
+    # Seconds since its last render before a part is considered idle
+    "part_idle_seconds": 300,
+    # Whether to measure allocations during part initialize and render with
+    # tracemalloc. This slows down every allocation in the kernel.
+    "part_memory_tracemalloc": False,
+    # How errors in kernel parts and expressions are formatted: "compact"
+    # (colored), "plain", or "verbose" (IPython's VerboseTB, which is slow)
+    "error_traceback_style": "compact",
+    # Number of recent errors kept so that clients can ask for their details
+    "error_details_cache_size": 16,
 }
 
 _local_dir = os.environ.get("CFG_SETTINGS_FILE") or os.path.abspath(
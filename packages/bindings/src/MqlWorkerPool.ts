@@ -230,10 +230,15 @@ export class MqlWorkerPool extends Disposable {
                         result: serialize(result)
                     });
                 })
-                .catch(err => {
+                .catch(async err => {
                     // TODO: genericize error handling? Part overlays also do this
                     if ((err as any)["prettyTraceback"] !== null) {
-                        err = new Error(err.message + "\n\n" + err.traceback);
+                        // Workers can't ask the kernel for a detailed
+                        // traceback later, so fetch it now if there is one
+                        const details = typeof err.getDetails === "function"
+                            ? await err.getDetails().catch(() => null)
+                            : null;
+                        err = new Error(err.message + "\n\n" + (details || err.traceback));
                     }
                     owner.worker.postMessage({
                         type: WorkerMessage.MsgType.KernelEvalResult, id: id, error: serialize(err)
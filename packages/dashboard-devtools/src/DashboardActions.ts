@@ -183,6 +183,40 @@ export function DashboardActions(dashboard: Dashboard) {
             region.content.refresh();
         }
 
+        /**
+         * Refresh the focused kernel part under the kernel's profiler, and
+         * show the slowest calls.
+         *
+         * #### Notes
+         *
+         * Only parts that run on a kernel (such as Python parts) support this.
+         */
+        public static async ProfilePart() {
+            const region = layoutManager.focusedRegion;
+            if (!(region instanceof WidgetLayoutRegion) || !Private.isProfilable(region.content)) {
+                return;
+            }
+            const profile = region.content.profileNextRender();
+            region.content.refresh();
+            const result = await profile;
+            const el = new Widget();
+            el.title.label = "Render Profile";
+            const summary = document.createElement("pre");
+            summary.textContent = result == null
+                ? "The kernel did not send a profile for this render."
+                : result.summary + (result.path == null ? "" : "\nSaved to " + result.path);
+            summary.style.overflow = "auto";
+            el.node.appendChild(summary);
+            const hover = HoverManager.Instance!.openDialog({
+                hover: el,
+                width: 800,
+                height: 600,
+                owner: dashboard
+            });
+            await hover.onClosed;
+            el.dispose();
+        }
+
         /** Close the focused region. */
         public static CloseRegion() {
             const region = layoutManager.focusedRegion;
@@ -425,6 +459,7 @@ export function RegisterActions(
         AddNewTab:          namespace + ":hack:add-new-tab",
         AddNewTabCustom:    namespace + ":hack:add-new-tab-custom",
         RefreshPart:        namespace + ":hack:refresh-part",
+        ProfilePart:        namespace + ":hack:profile-part",
         CloseRegion:        namespace + ":hack:close-region",
         Export:             namespace + ":hack:export-dashboard",
         Import:             namespace + ":hack:import-dashboard",
@@ -582,6 +617,20 @@ export function RegisterActions(
         }
     });
 
+    commands.addCommand(DashboardCmds.ProfilePart, {
+        label: "Profile Part Render",
+        isEnabled: () => {
+            const region = getFocusedRegion();
+            return region instanceof WidgetLayoutRegion
+                && Private.isProfilable(region.content);
+        },
+        execute: () => {
+            const dashboard = getDashboard();
+            if (dashboard == null) return;
+            return DashboardActions(dashboard).ProfilePart();
+        }
+    });
+
     commands.addCommand(DashboardCmds.CloseRegion, {
         label: () => getFocusedRegion() instanceof WidgetLayoutRegion ? "Close Part" : "Close Panel",
         isEnabled: () => {
@@ -827,6 +876,7 @@ export function RegisterActions(
         "ToggleTitlebar",
         "ToggleMaximize",
         "RefreshPart",
+        "ProfilePart",
         "CloseRegion",
         "AddNewTabCustom",
         "CopyOptions",
@@ -913,3 +963,27 @@ export function RegisterActions(
         regionSelector
     );
 }
+
+namespace Private {
+    /** The profile a kernel part sends back for a profiled render */
+    export interface IRenderProfile {
+        summary: string;
+        path: string | null;
+        total_time: number;
+    }
+
+    /**
+     * Whether a widget is a part that can profile its renders.
+     *
+     * #### Notes
+     *
+     * This checks for `KernelProxyPart.profileNextRender` by shape, since the
+     * devtools don't depend on the Jupyter integration.
+     */
+    export function isProfilable(widget: unknown): widget is Part & {
+        profileNextRender(): Promise<IRenderProfile | null>
+    } {
+        return widget instanceof Part
+            && typeof (widget as any).profileNextRender === "function";
+    }
+}
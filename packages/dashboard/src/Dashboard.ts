@@ -213,6 +213,56 @@ export class Dashboard extends Widget implements IDirtyable {
         }
     }
 
+    /**
+     * Update the dashboard by applying a patch, instead of reloading it.
+     *
+     * Parts that the patch doesn't add or remove keep running, and only
+     * re-render if their options changed. Patches that change globals fall
+     * back to a full reload, as do patches that fail to apply.
+     *
+     * @param data The full model the patch produces
+     */
+    public async applyPatch(
+        patch: DashboardSerializer.IDashboardPatch,
+        data: DashboardSerializer.ISerializedDashboard
+    ) {
+        if (patch.globals) {
+            return this.loadFromModel(data);
+        }
+        let failed = false;
+        await this.isLoading.aquire();
+        try {
+            for (const id of patch.removedParts) {
+                if (this.partManager.getPartById(id) != null) {
+                    this.partManager.removePart(id);
+                }
+            }
+            for (const id in patch.changedParts) {
+                const options = patch.changedParts[id].options;
+                for (const optName in options) {
+                    this.partManager.setOptionForPart(id, optName, options[optName]);
+                }
+            }
+            await this.loadParts(patch.addedParts, data.metadata);
+            // re-created parts need new regions, even if the layout is the same
+            if (patch.layout
+                || patch.removedParts.length > 0
+                || Object.keys(patch.addedParts).length > 0
+            ) {
+                this.layoutManager.initLayout(data.layout, true);
+            }
+            this.setClean();
+        } catch (err) {
+            console.warn("[Dashboard] Failed to apply patch, reloading", err);
+            failed = true;
+        } finally {
+            this.isLoading.release();
+        }
+        if (failed) {
+            await this.loadFromModel(data);
+        }
+    }
+
     dispose() {
         if (this.isDisposed) {
             return;
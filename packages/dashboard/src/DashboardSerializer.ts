@@ -143,6 +143,29 @@ export namespace DashboardSerializer {
         localParts?: {[name: string]: JavascriptEvalPart.IUDPModel};
     }
 
+    /**
+     * A structural diff between two dashboard models.
+     *
+     * Kernels attach these to the output metadata of a dashboard when they
+     * update it in place, so that it can be patched instead of reloaded.
+     */
+    export interface IDashboardPatch {
+        /** The revision of the model this patch applies to */
+        base: string;
+        addedParts: ISerializedDashboard["parts"];
+        removedParts: string[];
+        /** Options that changed, by part */
+        changedParts: {
+            [guid: string]: {
+                options: PartSerializer.ISerializedPartOptions;
+            }
+        };
+        /** Whether the layout changed, in which case it's taken from the model */
+        layout: boolean;
+        /** Whether the globals changed, which requires a full reload */
+        globals: boolean;
+    }
+
     export interface IDashboardDocument extends DashboardSerializer.ISerializedDashboard {
         /** A script to run at startup for new kernels */
         init?: string[];
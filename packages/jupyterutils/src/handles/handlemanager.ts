@@ -29,6 +29,7 @@ export class DisplayHandleManager implements IDisposable {
     private _isDisposed = false;
     private readonly session: IClientSession;
     private readonly idToName = new Map<string, string>();
+    private readonly lastOutputs = new Map<string, DisplayHandle.IRenderData>();
     private readonly onHandleUpdatedSrc$ = new Subject<DisplayHandle.IRenderData>();
     private readonly _onHandleUpdated: Observable<DisplayHandle.IRenderData>;
 
@@ -62,17 +63,33 @@ export class DisplayHandleManager implements IDisposable {
         return this.idToName.values();
     }
 
+    /**
+     * Publish an output for a named handle.
+     *
+     * This is used to render outputs that the kernel cached for a handle, such
+     * as when a viewer reconnects to a kernel that already displayed them.
+     */
+    public publishOutput(output: DisplayHandle.IRenderData) {
+        this.lastOutputs.set(output.name, output);
+        this.onHandleUpdatedSrc$.next(output);
+    }
+
     public createHandle(
         name: string,
         registry: IRenderMimeRegistry,
         sanitizer: ISanitizer
     ) {
-        return new DisplayHandle({
+        const handle = new DisplayHandle({
             name,
             registry,
             sanitizer,
             onUpdated: this.onHandleUpdated
         });
+        const lastOutput = this.lastOutputs.get(name);
+        if (lastOutput != null) {
+            handle.render(lastOutput);
+        }
+        return handle;
     }
 
     private onKernelChanged(_: unknown, {oldValue, newValue}: Session.IKernelChangedArgs) {
@@ -91,6 +108,7 @@ export class DisplayHandleManager implements IDisposable {
     private destroyKernelHooks(kernel: Kernel.IKernel) {
         kernel.iopubMessage.disconnect(this.onKernelMsg, this);
         this.idToName.clear();
+        this.lastOutputs.clear();
     }
 
     private onKernelMsg(kernel: Kernel.IKernel, msg: KernelMessage.IIOPubMessage) {
@@ -104,7 +122,7 @@ export class DisplayHandleManager implements IDisposable {
         }
         const { data, metadata } = msg.content;
         // we know what the name is, so report it
-        this.onHandleUpdatedSrc$.next({
+        this.publishOutput({
             data,
             metadata,
             name
@@ -81,6 +81,8 @@ del _json`;
     private mimeTypeRegistry: IRenderMimeRegistry;
     private ready: Promise<void>;
     private expandToFill: boolean;
+    /** The revision of the kernel model last loaded, if unedited since */
+    private revision: string | null = null;
 
     constructor({
         rendermime,
@@ -130,6 +132,8 @@ del _json`;
         }
         evaluator.globals = this.dashboard.globals;
         this.dashboard.OnDirty.subscribe(() => {
+            // local edits mean patches from the kernel may no longer apply
+            this.revision = null;
             this.saveLayout();
             this.dashboard.setClean();
         });
@@ -145,7 +149,16 @@ del _json`;
         }
         this.dashboard.fit();
 
-        await this.dashboard.loadFromModel(dashboardModel);
+        const metadata = (model.metadata[DashboardSerializer.MAVEN_LAYOUT_MIME_TYPE] || {}) as {
+            revision?: string,
+            patch?: DashboardSerializer.IDashboardPatch
+        };
+        if (metadata.patch != null && this.revision != null && metadata.patch.base === this.revision) {
+            await this.dashboard.applyPatch(metadata.patch, dashboardModel);
+        } else {
+            await this.dashboard.loadFromModel(dashboardModel);
+        }
+        this.revision = metadata.revision || null;
     }
 
 
@@ -65,13 +65,32 @@ export class KernelExpressionEvaluator implements IDisposable, IExpressionEvalua
         );
         const value = Converters.deserialize(returnMsg.payload);
         if (returnMsg.msg_type === "expr_error") {
-            const err = await KernelError.Create(value, this.session.kernelDisplayName);
+            const errorId = returnMsg.error_id;
+            const err = await KernelError.Create(
+                value,
+                this.session.kernelDisplayName,
+                errorId == null ? undefined : () => this.getErrorDetails(errorId)
+            );
             throw err;
         } else {
             return value;
         }
     }
 
+    /** Ask the kernel for the detailed traceback of an expression error */
+    public async getErrorDetails(errorId: string): Promise<string | null> {
+        const uuid = UUID.uuid4();
+        const returnMsg = await this.comm.sendAndAwaitResponse({
+                msg_type: "get_error_details",
+                error_id: errorId,
+                uuid
+            } as KernelExpressionEvaluator.ICommSendMsg & JSONDataObject,
+            (i): i is KernelExpressionEvaluator.ICommRecvMsg & JSONDataObject => i.parent === uuid,
+            20000
+        );
+        return returnMsg.payload as unknown as string | null;
+    }
+
     public getMetadata() {
         return {
             editorMode: "" + this.session.kernel!.info!.language_info.mimetype
@@ -84,8 +103,8 @@ export namespace KernelExpressionEvaluator {
         session: IClientSession;
     }
 
-    export type ICommRecvMessageTypes = "expr_value" | "expr_error";
-    export type ICommSendMessageTypes = "evaluate_expr";
+    export type ICommRecvMessageTypes = "expr_value" | "expr_error" | "error_details";
+    export type ICommSendMessageTypes = "evaluate_expr" | "get_error_details";
 
     export interface ICommMsg {
         msg_type: string;
@@ -95,12 +114,16 @@ export namespace KernelExpressionEvaluator {
         msg_type: ICommRecvMessageTypes;
         payload: JSONObject;
         parent: string;
+        /** An id for an expr_error, used to ask for the error's details */
+        error_id?: string | null;
     }
 
     export interface ICommSendMsg extends ICommMsg {
         msg_type: ICommSendMessageTypes;
-        expr: string;
-        globals: {[globalName: string]: JSONObject};
+        expr?: string;
+        globals?: {[globalName: string]: JSONObject};
         uuid: string;
+        /** The error to get details for, for get_error_details */
+        error_id?: string;
     }
 }
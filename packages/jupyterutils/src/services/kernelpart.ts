@@ -1,7 +1,7 @@
 import { MimeModel, IRenderMime } from "@jupyterlab/rendermime";
 import { Converters, JSONObject as SerializedObject } from "@mavenomics/coreutils";
 import { Part, OptionsBag } from "@mavenomics/parts";
-import { JSONObject, JSONExt } from "@phosphor/coreutils";
+import { JSONObject, JSONExt, PromiseDelegate } from "@phosphor/coreutils";
 import { filter } from "rxjs/operators";
 import { CommManager, KernelError } from "../utils";
 
@@ -17,9 +17,21 @@ export abstract class KernelProxyPart extends Part {
     public msgId: string; // A unique ID for kernel comms
     public model: MimeModel | null = null;
     public renderer: IRenderMime.IRenderer | null = null;
+    /** The profile of the last render that was profiled, if any */
+    public lastProfile: Msg.IProfile | null = null;
     protected readonly type: string;
+    /** How long to wait for options to settle before rendering, if at all */
+    protected readonly debounceMs: number = 0;
     private comm: CommManager<Msg.KernelProxyMessage, Msg.KernelResponseMessage>;
     private bag: OptionsBag | null = null;
+    /** The last binary output rendered, used to skip redundant renders */
+    private lastBuffer: DataView | null = null;
+    /** The blob URL of the last rendered image, revoked when it's replaced */
+    private blobUrl: string | null = null;
+    /** The options sent by the last debounced render, and when it finished */
+    private lastDebounced: { options: JSONObject, finished: number } | null = null;
+    /** Set when the next render should run under the kernel's profiler */
+    private profileRequest: PromiseDelegate<Msg.IProfile | null> | null = null;
 
     constructor(opts: Part.IOptions) {
         super(opts);
@@ -39,6 +51,22 @@ export abstract class KernelProxyPart extends Part {
 
     public getName() { return this.type; }
 
+    /**
+     * Profile the next render of this part on the kernel.
+     *
+     * The profile summary is also logged to the console and kept in
+     * `lastProfile`.
+     *
+     * @returns A promise that resolves to the profile once the part has
+     * rendered, or null if the kernel didn't send one.
+     */
+    public profileNextRender() {
+        if (this.profileRequest == null) {
+            this.profileRequest = new PromiseDelegate<Msg.IProfile | null>();
+        }
+        return this.profileRequest.promise;
+    }
+
     public async setup() {
         const uuid = this.msgId;
         await this.comm.send({
@@ -64,47 +92,96 @@ export abstract class KernelProxyPart extends Part {
             payload: null
         }, (i): i is Msg.IInitDoneMsg => i.msg_type === "initialize_done" && i.uuid === uuid);
         if (!!res.error) {
-            throw await KernelError.Create(res.error, this.context.session!.kernelDisplayName);
+            throw await this.createError(res);
         }
     }
 
     public async render(opts: OptionsBag) {
         this.bag = opts;
         const uuid = this.msgId;
+        let serializedOptions = Private.serializeOptions(opts);
+        if (this.debounceMs > 0) {
+            // Renders are queued while one is in flight, so after a burst of
+            // changes the renders behind a debounced one will usually have
+            // nothing new to send.
+            if (this.lastDebounced != null
+                && performance.now() - this.lastDebounced.finished < this.debounceMs
+                && JSONExt.deepEqual(this.lastDebounced.options, serializedOptions)
+            ) {
+                return;
+            }
+            await new Promise(resolve => setTimeout(resolve, this.debounceMs));
+            // pick up whatever changed while we waited
+            serializedOptions = Private.serializeOptions(opts);
+        }
         while (this.layout.widgets.length > 1) {
             this.layout.removeWidgetAt(1);
         }
-        const serializedOptions: {[name: string]: SerializedObject | null} = {};
-        for (const opt of opts) {
-            serializedOptions[opt.name] = Converters.serialize(opt.value, opt.type);
-        }
+        const profileRequest = this.profileRequest;
+        this.profileRequest = null;
         const res = await this.comm.sendAndAwaitResponse({
             uuid,
             msg_type: "render",
-            payload: serializedOptions as JSONObject
+            payload: serializedOptions,
+            accept_buffers: true,
+            profile: profileRequest != null
         }, (i): i is Msg.IRenderDoneMsg => i.msg_type === "render_done" && i.uuid === uuid);
+        if (res.profile != null) {
+            this.lastProfile = res.profile;
+            console.log("[KernelProxyPart]", "Render profile for", this.msgId);
+            console.log(res.profile.summary);
+        }
+        if (profileRequest != null) {
+            profileRequest.resolve(res.profile || null);
+        }
+        if (this.debounceMs > 0) {
+            this.lastDebounced = {options: serializedOptions, finished: performance.now()};
+        }
         if (!!res.error) {
-            throw await KernelError.Create(res.error, this.context.session!.kernelDisplayName);
+            throw await this.createError(res);
         }
 
-        const mimetype = this.context.rendermime!.preferredMimeType(res.payload.data, "any") || "text/plain";
+        const { data, metadata } = res.payload;
+        // Binary outputs (like PNGs) arrive as raw comm buffers instead of
+        // base64 strings in the bundle
+        const bufferRefs = res.payload.buffers || {};
+        const buffers = CommManager.GetBuffers(res);
+        const available: JSONObject = {...data};
+        for (const binaryType of Object.keys(bufferRefs)) {
+            available[binaryType] = "";
+        }
+        const mimetype = this.context.rendermime!.preferredMimeType(available, "any") || "text/plain";
+        const buffer = mimetype in bufferRefs ? buffers[bufferRefs[mimetype]] : null;
 
         if (this.model && this.renderer
-            && JSONExt.deepEqual(this.model.data[mimetype], res.payload.data[mimetype])
-            && JSONExt.deepEqual(this.model.metadata[mimetype], res.payload.metadata[mimetype])
+            && (buffer != null
+                ? Private.buffersEqual(this.lastBuffer, buffer)
+                : JSONExt.deepEqual(this.model.data[mimetype], data[mimetype]))
+            && JSONExt.deepEqual(this.model.metadata[mimetype], metadata[mimetype])
         ) {
             // Don't re-render, the model hasn't changed
             return;
         }
-        if (this.renderer) {
-            // clean up last render
-            this.renderer.dispose();
+        this.cleanupRender();
+
+        let rendererType = mimetype;
+        let modelData = data;
+        if (buffer != null && mimetype.startsWith("image/")) {
+            this.blobUrl = URL.createObjectURL(new Blob([buffer], {type: mimetype}));
+            rendererType = "text/html";
+            modelData = {
+                ...data,
+                "text/html": Private.imgTag(this.blobUrl, metadata[mimetype] as JSONObject)
+            };
+        } else if (buffer != null) {
+            modelData = {...data, [mimetype]: Private.toBase64(buffer)};
         }
+        this.lastBuffer = buffer;
 
-        this.renderer = this.context.rendermime!.createRenderer(mimetype);
+        this.renderer = this.context.rendermime!.createRenderer(rendererType);
         this.model = this.context.rendermime!.createModel({
-            data: res.payload.data,
-            metadata: res.payload.metadata,
+            data: modelData,
+            metadata: {...metadata, [rendererType]: metadata[mimetype]},
             trusted: true
         });
         await this.renderer.renderModel(this.model);
@@ -123,11 +200,89 @@ export abstract class KernelProxyPart extends Part {
             });
         }
         this.comm.dispose();
+        this.cleanupRender();
         super.dispose();
     }
+
+    private createError(res: Msg.IInitDoneMsg | Msg.IRenderDoneMsg) {
+        const uuid = this.msgId;
+        const errorId = res.error_id;
+        return KernelError.Create(
+            res.error,
+            this.context.session!.kernelDisplayName,
+            errorId == null ? undefined : async () => {
+                const details = await this.comm.sendAndAwaitResponse({
+                    uuid,
+                    msg_type: "get_error_details",
+                    payload: errorId
+                }, (i): i is Msg.IErrorDetailsMsg => i.msg_type === "error_details" && i.uuid === uuid);
+                return details.payload;
+            }
+        );
+    }
+
+    private cleanupRender() {
+        if (this.renderer) {
+            // clean up last render
+            this.renderer.dispose();
+        }
+        if (this.blobUrl != null) {
+            URL.revokeObjectURL(this.blobUrl);
+            this.blobUrl = null;
+        }
+        this.lastBuffer = null;
+    }
 }
 
-namespace Msg {
+namespace Private {
+    export function serializeOptions(opts: OptionsBag) {
+        const serializedOptions: {[name: string]: SerializedObject | null} = {};
+        for (const opt of opts) {
+            serializedOptions[opt.name] = Converters.serialize(opt.value, opt.type);
+        }
+        return serializedOptions as JSONObject;
+    }
+
+    export function buffersEqual(a: DataView | null, b: DataView) {
+        if (a == null || a.byteLength !== b.byteLength) {
+            return false;
+        }
+        for (let i = 0; i < a.byteLength; i++) {
+            if (a.getUint8(i) !== b.getUint8(i)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    export function toBase64(buffer: DataView) {
+        const bytes = new Uint8Array(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+        let binary = "";
+        // chunked, since fromCharCode.apply has an argument limit
+        const chunkSize = 0x8000;
+        for (let i = 0; i < bytes.length; i += chunkSize) {
+            binary += String.fromCharCode.apply(
+                null,
+                bytes.subarray(i, i + chunkSize) as unknown as number[]
+            );
+        }
+        return btoa(binary);
+    }
+
+    export function imgTag(src: string, metadata?: JSONObject) {
+        let attrs = "";
+        if (metadata != null) {
+            for (const dim of ["width", "height"]) {
+                if (typeof metadata[dim] === "number") {
+                    attrs += ` ${dim}="${metadata[dim]}"`;
+                }
+            }
+        }
+        return `<img src="${src}"${attrs}/>`;
+    }
+}
+
+export namespace Msg {
     interface IProxyMsg extends JSONObject {
         uuid: string;
     }
@@ -150,24 +305,49 @@ namespace Msg {
     export interface IRenderMsg extends IProxyMsg {
         msg_type: "render";
         payload: JSONObject;
+        /** Whether binary outputs may be sent as comm buffers */
+        accept_buffers?: boolean;
+        /** Whether to run this render under the kernel's profiler */
+        profile?: boolean;
     }
 
-    export type KernelProxyMessage = ICreateMsg | IInitMsg | IRenderMsg | IDisposeMsg;
+    export interface IGetErrorDetailsMsg extends IProxyMsg {
+        msg_type: "get_error_details";
+        /** The error_id of a failed initialize or render */
+        payload: string;
+    }
+
+    export type KernelProxyMessage = ICreateMsg | IInitMsg | IRenderMsg
+        | IDisposeMsg | IGetErrorDetailsMsg;
 
     interface IReponseMsg extends JSONObject {
         uuid: string;
         error?: any;
+        /** An id for the error, used to ask the kernel for its details */
+        error_id?: string | null;
     }
 
     export interface IInitDoneMsg extends IReponseMsg {
         msg_type: "initialize_done";
     }
 
+    export interface IProfile extends JSONObject {
+        /** The slowest calls, as formatted by pstats */
+        summary: string;
+        /** Where the kernel saved the full profile, if it did */
+        path: string | null;
+        /** Total time spent, in seconds */
+        total_time: number;
+    }
+
     export interface IRenderDoneMsg extends IReponseMsg {
         msg_type: "render_done";
+        profile?: IProfile;
         payload: {
             data: JSONObject;
             metadata: JSONObject;
+            /** Maps binary mimetypes to the index of the buffer holding them */
+            buffers?: {[mimetype: string]: number};
         };
     }
 
@@ -179,5 +359,12 @@ namespace Msg {
         };
     }
 
-    export type KernelResponseMessage = IInitDoneMsg | IRenderDoneMsg | IStaleMsg;
+    export interface IErrorDetailsMsg extends IReponseMsg {
+        msg_type: "error_details";
+        /** The detailed traceback, or null if the kernel no longer has it */
+        payload: string | null;
+    }
+
+    export type KernelResponseMessage = IInitDoneMsg | IRenderDoneMsg | IStaleMsg
+        | IErrorDetailsMsg;
 }
@@ -1,4 +1,5 @@
 import { IClientSession } from "@jupyterlab/apputils";
+import { nbformat } from "@jupyterlab/coreutils";
 import { JSONObject as SerializedJSONObject, Types, Converters } from "@mavenomics/coreutils";
 import { PartFactory, Part } from "@mavenomics/parts";
 import { JSONObject, PromiseDelegate } from "@phosphor/coreutils";
@@ -33,6 +34,21 @@ export class SyncMetadata implements IDisposable {
                         msg.handle_id,
                         msg.handle_name
                     );
+                    // The kernel may have already displayed something to
+                    // this handle, so ask for it
+                    this.comm.send({
+                        msg_type: "get_display_handle_output",
+                        handle_name: msg.handle_name
+                    });
+                    break;
+                case "display_handle_output":
+                    if (msg.data != null) {
+                        this.handleManager.publishOutput({
+                            name: msg.handle_name,
+                            data: msg.data,
+                            metadata: msg.metadata || {}
+                        });
+                    }
                     break;
             }
         });
@@ -93,6 +109,7 @@ export class SyncMetadata implements IDisposable {
             }
 
             protected readonly type: string = part.name;
+            protected readonly debounceMs: number = part.debounce_ms || 0;
 
             constructor(args: Part.IOptions) {
                 super(args);
@@ -113,6 +130,8 @@ export namespace SyncMetadata {
                 type: string;
                 value: SerializedJSONObject
             }>,
+            /** How long to let options settle before rendering, if at all */
+            debounce_ms?: number;
         };
     }
 
@@ -130,6 +149,22 @@ export namespace SyncMetadata {
         handle_name: string;
     }
 
-    export type ISendMsg = IPartsRequest | INewPartMsg;
-    export type IRecvMsg = IPartsSent | INewPartMsg | INewDisplayHandle;
+    interface IDisplayOutputRequest extends JSONObject {
+        msg_type: "get_display_handle_output";
+        handle_name: string;
+    }
+
+    interface IDisplayOutput extends JSONObject {
+        msg_type: "display_handle_output";
+        handle_id: string | null;
+        handle_name: string;
+        data: nbformat.IMimeBundle | null;
+        metadata: JSONObject | null;
+    }
+
+    export type ISendMsg = IPartsRequest | INewPartMsg | IDisplayOutputRequest;
+    export type IRecvMsg = IPartsSent
+        | INewPartMsg
+        | INewDisplayHandle
+        | IDisplayOutput;
 }
@@ -26,6 +26,21 @@ export class CommManager<
     MsgType extends JSONValue,
     ResponseType extends JSONValue = MsgType
 > implements IDisposable {
+    /**
+     * Get the binary buffers that were sent alongside a kernel message.
+     *
+     * @remarks
+     *
+     * Buffers aren't JSON, so they can't live on the message itself. Instead,
+     * they're attached to the message object emitted by `msgRecieved`, and
+     * can be retrieved using this function. Returns an empty array if the
+     * message didn't come with any buffers.
+     */
+    public static GetBuffers(msg: JSONValue): ReadonlyArray<DataView> {
+        if (msg == null || typeof msg !== "object") return [];
+        return Private.MessageBuffers.get(msg) || [];
+    }
+
     /** Create a new CommManager, or recycle an already-instantiated manager */
     public static Create<T extends JSONValue, U extends JSONValue>({
         session,
@@ -51,6 +66,8 @@ export class CommManager<
     private comm: Kernel.IComm | null = null;
     private _isDisposed = false;
     private connectionLock: AsyncTools.Mutex;
+    /** Messages waiting to be decoded, so that they're emitted in order */
+    private msgQueue: Promise<void> = Promise.resolve();
     /** This is a flag to check for kernel setup.
      *
      * If this comm attempts to connect and fails, then `#connectToComm()` will
@@ -209,9 +226,32 @@ export class CommManager<
         await this.session.ready;
         this.comm = this.session.kernel.connectToComm(this._commName);
         this.comm.onMsg = (msg) => {
-            this._msgRecievedSrc$.next(msg.content.data as ResponseType);
+            const buffers = (msg.buffers || []).map(buf =>
+                ArrayBuffer.isView(buf)
+                    ? new DataView(buf.buffer, buf.byteOffset, buf.byteLength)
+                    : new DataView(buf)
+            );
+            // Decompression is async, so messages are queued to keep a large
+            // message from being overtaken by a smaller one sent after it.
+            this.msgQueue = this.msgQueue
+                .then(() => Private.DecodeMessage(msg.content.data, buffers))
+                .then(decoded => {
+                    const data = decoded.data as ResponseType;
+                    if (decoded.buffers.length > 0
+                        && data != null && typeof data === "object") {
+                        Private.MessageBuffers.set(data, decoded.buffers);
+                    }
+                    this._msgRecievedSrc$.next(data);
+                })
+                .catch(err => {
+                    console.error("[CommManager]", "Failed to decode message", err);
+                });
         };
-        const commFuture = this.comm.open();
+        // Tell the kernel which encodings we can decompress. Kernels that
+        // don't support compression will ignore this.
+        const commFuture = this.comm.open({
+            accept_encodings: Private.ACCEPT_ENCODINGS
+        });
         await commFuture.done;
         commFuture.dispose();
         // This is distinct from being open: By now, if the comm is ready, then
@@ -288,6 +328,45 @@ export namespace CommManager {
 }
 
 namespace Private {
+    export const MessageBuffers = new WeakMap<object, DataView[]>();
+
+    /**
+     * The encodings that this browser can decompress.
+     *
+     * Browsers only have built-in support for gzip and deflate, so zstd and
+     * lz4 are never advertised.
+     */
+    export const ACCEPT_ENCODINGS: string[] = (
+        typeof (window as any).DecompressionStream === "function"
+            ? ["gzip"]
+            : []
+    );
+
+    /**
+     * Decompress a message, if the kernel compressed it.
+     *
+     * Compressed messages have an `encoding` key, and the compressed JSON of
+     * the original message in their last buffer.
+     */
+    export async function DecodeMessage(
+        data: JSONValue,
+        buffers: DataView[]
+    ): Promise<{data: JSONValue, buffers: DataView[]}> {
+        if (data == null || typeof data !== "object" || Array.isArray(data)
+            || typeof data["encoding"] !== "string" || buffers.length === 0) {
+            return {data, buffers};
+        }
+        const encoded = buffers[buffers.length - 1];
+        const stream = (new Blob([encoded]) as any).stream().pipeThrough(
+            new (window as any).DecompressionStream(data["encoding"])
+        );
+        const decoded = await new Response(stream).arrayBuffer();
+        return {
+            data: JSON.parse(new TextDecoder().decode(decoded)),
+            buffers: buffers.slice(0, -1)
+        };
+    }
+
     export const InstanceMap = new AttachedProperty<
         IClientSession,
         Array<CommManager<any>>
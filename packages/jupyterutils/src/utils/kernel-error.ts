@@ -2,31 +2,67 @@ import { defaultSanitizer } from "@jupyterlab/apputils";
 import { renderText } from "@jupyterlab/rendermime";
 
 export class KernelError extends Error {
-    /** Create a new kernel error with a pretty stacktrace */
-    public static async Create(traceback: string | string[], kernelDisplayName: string) {
+    /**
+     * Create a new kernel error with a pretty stacktrace
+     *
+     * @param getDetails An optional function that asks the kernel for a more
+     * detailed traceback of this error, such as the locals of each frame.
+     * Kernels send compact tracebacks by default, since formatting details
+     * for every error is slow.
+     */
+    public static async Create(
+        traceback: string | string[],
+        kernelDisplayName: string,
+        getDetails?: () => Promise<string | null>
+    ) {
         if (Array.isArray(traceback)) {
             traceback = traceback.join("\n");
         }
         const err = new KernelError(traceback, kernelDisplayName);
+        err.getDetails = getDetails || null;
         await err._onRendered;
         return err;
     }
 
     public traceback: string;
     public prettyTraceback: string;
+    /** Fetch a detailed traceback from the kernel, if it supports that */
+    public getDetails: (() => Promise<string | null>) | null = null;
     protected _onRendered: Promise<void>;
 
     constructor(traceback_raw: string, kernel_lang: string) {
         super("Error in " + kernel_lang + " code");
-        const host = document.createElement("p");
         this.traceback = traceback_raw;
         this.prettyTraceback = "";
-        this._onRendered = renderText({
-            source: traceback_raw,
+        this._onRendered = Private.renderTraceback(traceback_raw).then(html => {
+            this.prettyTraceback = html;
+        });
+    }
+
+    /**
+     * Fetch the detailed traceback from the kernel, formatted like
+     * `prettyTraceback`.
+     *
+     * @returns The formatted traceback, or null if the kernel can't provide
+     * one (such as if it no longer remembers the error).
+     */
+    public async getPrettyDetails(): Promise<string | null> {
+        if (this.getDetails == null) {
+            return null;
+        }
+        const details = await this.getDetails();
+        return details == null ? null : Private.renderTraceback(details);
+    }
+}
+
+namespace Private {
+    export async function renderTraceback(traceback: string) {
+        const host = document.createElement("p");
+        await renderText({
+            source: traceback,
             host,
             sanitizer: defaultSanitizer
-        }).then(() => {
-            this.prettyTraceback = host.innerHTML;
         });
+        return host.innerHTML;
     }
 }
@@ -111,11 +111,29 @@ export class LayoutManager extends Widget implements IDirtyable {
         this.externalParts = parts;
     }
 
-    initLayout(serializedLayout: LayoutSerializer.ISerializedLayoutRegion) {
+    /**
+     * Replace the layout with a serialized one.
+     *
+     * @param reuseWidgets If true, the widgets in the current layout are kept
+     * alive so that the new layout can adopt them, instead of being disposed
+     * along with their regions. Widgets the new layout doesn't reference must
+     * then be disposed by their owner.
+     */
+    initLayout(serializedLayout: LayoutSerializer.ISerializedLayoutRegion, reuseWidgets = false) {
         if (!serializedLayout) {
             return; // no layout to setup
         }
 
+        if (reuseWidgets) {
+            for (const region of IterTools.dfs_iter(
+                this.root.widgets,
+                i => i instanceof RegionWithChildren ? i.widgets : undefined
+            )) {
+                if (region instanceof WidgetLayoutRegion) {
+                    region.releaseContent();
+                }
+            }
+        }
         this.root.dispose();
         this.root = LayoutSerializer.fromJson(serializedLayout, this) as StackPanelLayoutRegion;
         this.root.setFresh();
@@ -25,6 +25,7 @@ export class WidgetLayoutRegion extends DashboardLayoutRegion<WidgetLayoutRegion
     typeName = LayoutTypes.WidgetLayoutRegion;
     public readonly guid!: string;
     public readonly content!: Widget;
+    private contentReleased = false;
 
     constructor(owner: LayoutManager, child: Widget, guid: string, regionUuid?: string) {
         super(owner, regionUuid);
@@ -54,11 +55,24 @@ export class WidgetLayoutRegion extends DashboardLayoutRegion<WidgetLayoutRegion
         return this.content;
     }
 
+    /**
+     * Detach the child from this region, so that it outlives the region.
+     *
+     * This is used to move widgets into a new layout without re-creating them.
+     */
+    public releaseContent(): Widget {
+        this.contentReleased = true;
+        this.content.parent = null;
+        return this.content;
+    }
+
     public dispose() {
         if (this.isDisposed) {
             return;
         }
-        this.content.dispose();
+        if (!this.contentReleased) {
+            this.content.dispose();
+        }
         super.dispose();
     }
 }
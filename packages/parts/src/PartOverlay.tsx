@@ -50,6 +50,10 @@ export const PartOverlay: React.SFC<PartOverlay.IProps> = ({
         return (<div>
             <h2>{partStateDetail.message}</h2>
             { stack }
+            { typeof (partStateDetail as any).getPrettyDetails === "function"
+                && (partStateDetail as any).getDetails != null
+                ? <ErrorDetails error={partStateDetail as any} />
+                : null }
         </div>);
     };
     const renderDetail = () => {
@@ -95,7 +99,61 @@ export const PartOverlay: React.SFC<PartOverlay.IProps> = ({
     );
 };
 
+/**
+ * A toggle that fetches and shows the detailed traceback of a kernel error.
+ *
+ * Kernels send compact tracebacks, and keep the details (like the locals of
+ * each frame) until they're asked for.
+ */
+const ErrorDetails: React.SFC<{error: PartOverlay.IDetailedError}> = ({error}) => {
+    // the details as HTML, or a plain-text message if they couldn't be fetched
+    const [details, setDetails] = React.useState<{html: string} | {text: string} | null>(null);
+    const [state, setState] = React.useState<"hidden" | "loading" | "shown">("hidden");
+    const toggle = async () => {
+        if (state === "shown") {
+            setState("hidden");
+            return;
+        }
+        if (details != null) {
+            setState("shown");
+            return;
+        }
+        setState("loading");
+        try {
+            const html = await error.getPrettyDetails();
+            setDetails(html == null
+                ? {text: "The kernel no longer has the details of this error."}
+                : {html});
+        } catch (err) {
+            setDetails({text: "Could not fetch the details of this error: " + err});
+        }
+        setState("shown");
+    };
+    return (<div>
+        <button className="m-PartOverlay-Button"
+            disabled={state === "loading"}
+            onClick={toggle}>
+            <span className="m-PartOverlay-ButtonContent">
+                {state === "shown" ? "Hide details" : state === "loading" ? "Loading..." : "Show details"}
+            </span>
+        </button>
+        {state !== "shown" || details == null ? null
+            : "text" in details ? <pre className="errorDetail">{details.text}</pre>
+            : <div style={{
+                    minWidth: "62em",
+                    background: "var(--jp-error-color3)"
+                }}
+                className="jp-RenderedText"
+                dangerouslySetInnerHTML={{__html: details.html}}></div>}
+    </div>);
+};
+
 export namespace PartOverlay {
+    /** An error that can fetch a detailed traceback, like a `KernelError` */
+    export interface IDetailedError extends Error {
+        getPrettyDetails(): Promise<string | null>;
+    }
+
     export interface IProps {
         partState: string;
         partStateDetail: any;
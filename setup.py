@@ -39,6 +39,6 @@ setup(
             "pyarrow"
         ]
     },
-    python_requires="~=3.6",
+    python_requires=">=3.7",
     include_package_data=True
 )